@@ -1,25 +1,60 @@
 #!/usr/bin/env python3
 import os
-import json
+import atexit
+import threading
 import time
 import random
 import sys
 import argparse
 from loguru import logger
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import yaml
-from dotenv import load_dotenv
+import orjson
 
-from src.job_discovery import JobDiscovery
-from src.resume_customizer import ResumeCustomizer
-from src.application_submitter import ApplicationSubmitter
-from src.captcha_handler import CaptchaHandler
-from src.utils import setup_logging, create_directory_structure, get_resume_path, get_cover_letter_path, check_ollama_available, debug_env_vars, prompt_yes_no
+from src.utils import setup_logging, create_directory_structure, get_cover_letter_path, check_ollama_available, warmup, debug_env_vars, load_env_once, prompt_yes_no, create_http_session, extract_text_from_pdf, get_cover_letter_path_for, write_file_if_changed, preload_ollama_model, PDF_TEXT_CACHE_DIR
 from src.config_helper import load_config_with_env_vars
-from src.cover_letter_generator import CoverLetterGenerator
 
-# Load environment variables from .env file
-load_dotenv()
+# Config changes made during the run are written back once at shutdown
+CONFIG_DIRTY = False
+_dirty_config = None
+
+def mark_config_dirty(config):
+    """Schedule the config to be saved when the application exits."""
+    global CONFIG_DIRTY, _dirty_config
+    CONFIG_DIRTY = True
+    _dirty_config = config
+
+def _flush_config():
+    """Save the config to disk if it was modified during the run."""
+    global CONFIG_DIRTY
+    if not CONFIG_DIRTY:
+        return
+    
+    try:
+        # Prefer the C-backed dumper when libyaml is available
+        dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+        with open('config/config.yaml', 'w') as f:
+            yaml.dump(_dirty_config, f, Dumper=dumper, default_flow_style=False)
+        CONFIG_DIRTY = False
+    except Exception as e:
+        logger.error(f"Error saving config: {str(e)}")
+
+atexit.register(_flush_config)
+
+# Content fingerprint each canonical cover letter was written under, keyed by job id
+LETTER_FINGERPRINTS_PATH = "data/cover_letters/.fingerprints.json"
+
+def _load_letter_fingerprints():
+    """Return the recorded {job id: content fingerprint} of existing cover letters."""
+    try:
+        with open(LETTER_FINGERPRINTS_PATH, 'rb') as f:
+            return orjson.loads(f.read())
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable cover letter fingerprints: {str(e)}")
+        return {}
 
 def load_config():
     """Load configuration from YAML file with environment variable support."""
@@ -38,6 +73,12 @@ def main():
     parser.add_argument("--cover-letters", action="store_true", help="Force cover letter generation")
     args = parser.parse_args()
     
+    # Heavy imports are deferred until after argument parsing so --help returns immediately
+    from src.job_discovery import JobDiscovery
+    
+    # Load environment variables from .env file
+    load_env_once()
+    
     # Setup logging
     setup_logging()
     logger.info("Starting automated job application system")
@@ -49,17 +90,20 @@ def main():
     config = load_config()
     logger.info(f"Loaded configuration with {len(config['job_search']['keywords'])} job keywords")
     
-    # Check Ollama availability
-    ollama_available = check_ollama_available(config)
+    # Share one pool of keep-alive connections across all HTTP calls
+    max_workers = config.get('llm', {}).get('max_workers', 3)
+    session = create_http_session(pool_maxsize=max(max_workers, 4))
+    
+    # Check Ollama availability and locate the resume concurrently
+    ollama_available, resume_path = warmup(config, session=session)
     if not ollama_available:
         logger.warning("Ollama is not available. Cover letter customization will be limited.")
+    else:
+        # Load the model in the background while job discovery runs
+        threading.Thread(target=preload_ollama_model, args=(config, session), daemon=True).start()
     
     # Initialize job discovery
-    job_discovery = JobDiscovery(config)
-    
-    # Initialize cover letter generator
-    max_workers = config.get('llm', {}).get('max_workers', 3)
-    cover_letter_generator = CoverLetterGenerator(config, max_workers=max_workers)
+    job_discovery = JobDiscovery(config, session=session)
     
     # Discover job listings
     logger.info("Discovering job listings...")
@@ -69,8 +113,7 @@ def main():
     filtered_jobs = jobs
     logger.info(f"Found {len(filtered_jobs)} potential job listings")
     
-    # Get resume path
-    resume_path = get_resume_path()
+    # Stop if no resume was found at startup
     if not resume_path:
         logger.error("No resume found. Please add your resume to data/resume.pdf")
         return
@@ -95,24 +138,95 @@ def main():
             config['application'] = {}
         config['application']['generate_cover_letters'] = generate_cover_letters
         
-        # Save updated config
-        with open('config/config.yaml', 'w') as f:
-            yaml.dump(config, f, default_flow_style=False)
+        # Save updated config at exit
+        mark_config_dirty(config)
     
     # Check for base cover letter
     cover_letter_path = None
+    resume_text = None
+    base_cover_letter_text = None
     if generate_cover_letters:
         cover_letter_path = get_cover_letter_path()
         if not cover_letter_path:
             logger.warning("No base cover letter found. Please add your cover letter to data/base_cover_letter.pdf or data/base_cover_letter.txt")
+        
+        # Extract resume and base cover letter text once for the whole batch, in parallel
+        pdf_text_cache_directory = config.get('cache', {}).get('pdf_text_directory', PDF_TEXT_CACHE_DIR)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            resume_future = executor.submit(extract_text_from_pdf, resume_path, pdf_text_cache_directory) if resume_path.endswith('.pdf') else None
+            letter_future = None
+            if cover_letter_path and cover_letter_path.endswith('.pdf'):
+                letter_future = executor.submit(extract_text_from_pdf, cover_letter_path, pdf_text_cache_directory)
+            elif cover_letter_path:
+                with open(cover_letter_path, 'r') as f:
+                    base_cover_letter_text = f.read()
+            
+            if resume_future:
+                resume_text = resume_future.result()
+            if letter_future:
+                base_cover_letter_text = letter_future.result()
     
     # Process each job
     processed_jobs = []
     
     if generate_cover_letters:
+        # Only load the generator (PDF and LLM dependencies) when cover letters are wanted
+        from src.cover_letter_generator import CoverLetterGenerator
+        from src.cover_letter_cache import SemanticCoverLetterCache
+        
+        # Initialize cover letter generator
+        cover_letter_generator = CoverLetterGenerator.from_config(
+            config, max_workers=max_workers, session=session,
+            resume_text=resume_text, base_text=base_cover_letter_text
+        )
+        
+        # Jobs that already have a cover letter written from the same resume, base letter and prompt need no further work
+        fingerprint = cover_letter_generator.content_fingerprint
+        letter_fingerprints = _load_letter_fingerprints()
+        cover_letter_paths = {}
+        todo = []
+        for job in filtered_jobs:
+            existing_path = get_cover_letter_path_for(job['id'])
+            if letter_fingerprints.get(job['id']) == fingerprint and os.path.exists(existing_path):
+                cover_letter_paths[job['id']] = existing_path
+            else:
+                todo.append(job)
+        
+        # Reuse letters written from the same inputs for near-identical descriptions; the generator reuses exact matches itself
+        semantic_cache = SemanticCoverLetterCache(config)
+        misses = []
+        for job in todo:
+            adapted_text = semantic_cache.lookup(job, fingerprint)
+            if adapted_text:
+                adapted_path = get_cover_letter_path_for(job['id'])
+                with open(adapted_path, 'w') as f:
+                    f.write(adapted_text)
+                cover_letter_paths[job['id']] = adapted_path
+                letter_fingerprints[job['id']] = fingerprint
+            else:
+                misses.append(job)
+        logger.info(f"Reusing {len(filtered_jobs) - len(misses)} existing cover letters")
+        
         # Group jobs for batch processing
-        logger.info(f"Processing {len(filtered_jobs)} jobs in parallel...")
-        cover_letter_paths = cover_letter_generator.generate_cover_letters_batch(filtered_jobs)
+        if misses:
+            logger.info(f"Processing {len(misses)} jobs in parallel...")
+            generated_paths = cover_letter_generator.generate_cover_letters_batch(misses)
+            
+            # These letters are rewritten now, so drop what their old versions were written from
+            for job in misses:
+                letter_fingerprints.pop(job['id'], None)
+            
+            # Only record and index letters customized by the LLM, not base cover letter copies
+            if ollama_available:
+                for job in misses:
+                    if generated_paths.get(job['id']):
+                        letter_fingerprints[job['id']] = fingerprint
+                        if cover_letter_generator.is_cacheable(job):
+                            semantic_cache.add(job, generated_paths[job['id']], fingerprint)
+                semantic_cache.save()
+            cover_letter_paths.update(generated_paths)
+        cover_letter_generator.close()
+        write_file_if_changed(LETTER_FINGERPRINTS_PATH, orjson.dumps(letter_fingerprints))
         
         # Add cover letter paths to jobs
         for job in filtered_jobs:
@@ -130,26 +244,26 @@ def main():
     
     # Display results
     if filtered_jobs:
-        print("\n=== Job Search Results ===")
+        # Build the whole report and write it in one go
+        lines = ["\n=== Job Search Results ==="]
         for i, job in enumerate(filtered_jobs, 1):
             # Clean up the URL for display
-            display_url = job['url'].split('?')[0] if '?' in job['url'] else job['url']
+            display_url = job['url'].partition('?')[0]
             
-            print(f"\n{i}. {job['title']}")
-            print(f"   Company: {job['company']}")
-            print(f"   Location: {job['location']}")
-            print(f"   URL: {display_url}")
+            lines.append(f"\n{i}. {job['title']}\n   Company: {job['company']}\n   Location: {job['location']}\n   URL: {display_url}")
             
             if generate_cover_letters and 'cover_letter_path' in job:
-                print(f"   Cover Letter: {os.path.basename(job['cover_letter_path'])}")
+                lines.append(f"   Cover Letter: {os.path.basename(job['cover_letter_path'])}")
+        sys.stdout.write("\n".join(lines) + "\n")
     else:
         print("\nNo jobs found matching your criteria.")
     
     # Save processed jobs to file
     if processed_jobs:
-        with open("data/processed_jobs.json", "w") as f:
-            json.dump(processed_jobs, f, indent=2)
-        logger.info(f"Saved {len(processed_jobs)} processed jobs to data/processed_jobs.json")
+        if write_file_if_changed("data/processed_jobs.json", orjson.dumps(processed_jobs, option=orjson.OPT_INDENT_2)):
+            logger.info(f"Saved {len(processed_jobs)} processed jobs to data/processed_jobs.json")
+        else:
+            logger.info("Processed jobs unchanged. Skipped writing data/processed_jobs.json")
     
     logger.info(f"Application session complete. Processed {len(processed_jobs)} jobs.")
 
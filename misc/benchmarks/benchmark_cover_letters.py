@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 import os
 import time
-import json
+import orjson
 import sys
+import itertools
 from dotenv import load_dotenv
 from loguru import logger
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # Add the parent directory to the path so we can import from src
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
@@ -24,12 +30,14 @@ def load_config():
     
     return config
 
-def load_sample_jobs():
-    """Load sample jobs from found_jobs.json."""
+def load_sample_jobs(limit=5):
+    """Load the first limit sample jobs from processed_jobs.json."""
     try:
-        with open("misc/benchmarks/processed_jobs.json", "r") as f:
-            jobs = json.load(f)
-            return jobs
+        with open("misc/benchmarks/processed_jobs.json", "rb") as f:
+            # Stream-parse only the jobs we need when ijson is available
+            if ijson:
+                return list(itertools.islice(ijson.items(f, 'item'), limit))
+            return orjson.loads(f.read())[:limit]
     except Exception as e:
         logger.error(f"Error loading sample jobs: {str(e)}")
         return []
@@ -75,14 +83,12 @@ def main():
     # Load configuration
     config = load_config()
     
-    # Load sample jobs
-    jobs = load_sample_jobs()
+    # Load 5 sample jobs for benchmarking
+    jobs = load_sample_jobs(limit=5)
     if not jobs:
         logger.error("No jobs found for benchmarking")
         return
     
-    # Limit to 5 jobs for benchmarking
-    jobs = jobs[:5]
     logger.info(f"Benchmarking with {len(jobs)} jobs")
     
     # Benchmark sequential
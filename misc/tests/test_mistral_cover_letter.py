@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import os
+import json
 import requests
 from dotenv import load_dotenv
 import time
@@ -8,42 +9,31 @@ import sys
 # Add the parent directory to the path so we can import from src
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from src.utils import get_resume_path
+from src.utils import get_resume_path, extract_text_from_pdf, fetch_ollama_tags
 
 # Load environment variables
 load_dotenv()
 
+# Reuse one keep-alive connection for every request to Ollama
+SESSION = requests.Session()
+SESSION.headers['Connection'] = 'keep-alive'
+
 # Get Ollama host from environment or use default
 ollama_host = os.environ.get('OLLAMA_HOST', 'http://localhost:11434')
 model = "mistral:latest"
 
-def extract_text_from_pdf(pdf_path):
-    """Extract text from a PDF file."""
-    try:
-        from PyPDF2 import PdfReader
-        reader = PdfReader(pdf_path)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text
-    except Exception as e:
-        print(f"Error extracting text from PDF: {str(e)}")
-        return ""
-
 def generate_sample_cover_letter():
     """Generate a sample cover letter using Mistral"""
     
     # Check if Ollama is available
     try:
-        url = f"{ollama_host}/api/tags"
-        response = requests.get(url)
+        status_code, models = fetch_ollama_tags(ollama_host, SESSION)
         
-        if response.status_code != 200:
+        if status_code != 200:
             print(f"❌ Ollama server not available at {ollama_host}")
             return
             
         # Check if mistral model is available
-        models = response.json().get('models', [])
         if not any(m.get('name') == model for m in models):
             print(f"❌ Model '{model}' not found in Ollama")
             return
@@ -66,7 +56,7 @@ def generate_sample_cover_letter():
     resume_path = get_resume_path()
     resume_text = ""
     if resume_path and os.path.exists(resume_path):
-        resume_text = extract_text_from_pdf(resume_path)
+        resume_text = extract_text_from_pdf(resume_path) or ""
         print(f"Loaded resume from {resume_path}")
     else:
         print("No resume found. Using placeholder resume text.")
@@ -97,7 +87,7 @@ def generate_sample_cover_letter():
     base_cover_letter_path = "data/base_cover_letter.pdf"
     base_cover_letter_text = ""
     if os.path.exists(base_cover_letter_path):
-        base_cover_letter_text = extract_text_from_pdf(base_cover_letter_path)
+        base_cover_letter_text = extract_text_from_pdf(base_cover_letter_path) or ""
         print(f"Loaded base cover letter from {base_cover_letter_path}")
     else:
         print("No base cover letter found. Using placeholder cover letter text.")
@@ -165,41 +155,54 @@ Create a personalized cover letter for this job application that focuses on Sami
         payload = {
             "model": model,
             "prompt": combined_prompt,
-            "stream": False,
+            "stream": True,
             "options": {
                 "temperature": 0.7,
                 "num_predict": 1500
             }
         }
         
-        response = requests.post(url, json=payload)
-        
-        if response.status_code == 200:
-            result = response.json()
-            cover_letter = result.get('response', '').strip()
-            
-            # Post-process to fix signature if needed
-            if "[Your Name]" in cover_letter:
-                cover_letter = cover_letter.replace("[Your Name]", "Sami Farhat")
-                print("Fixed signature in cover letter")
+        with SESSION.post(url, json=payload, stream=True) as response:
+            if response.status_code != 200:
+                print(f"❌ Error: {response.status_code} - {response.text}")
+                return
             
-            # Print the result
-            print("Generated Cover Letter:")
-            print("=" * 50)
-            print(cover_letter)
-            print("=" * 50)
-            
-            # Print generation time
-            end_time = time.time()
-            print(f"\nGeneration took {end_time - start_time:.2f} seconds")
-            
-            # Save the cover letter to a file for review
+            # Write tokens to the review file as they arrive
             os.makedirs("data/cover_letters", exist_ok=True)
-            with open(f"data/cover_letters/test_cover_letter_{int(time.time())}.txt", "w") as f:
-                f.write(cover_letter)
-            print(f"Cover letter saved to data/cover_letters/test_cover_letter_{int(time.time())}.txt")
-        else:
-            print(f"❌ Error: {response.status_code} - {response.text}")
+            output_path = f"data/cover_letters/test_cover_letter_{int(time.time())}.txt"
+            parts = []
+            with open(output_path, "w") as out:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    out.write(chunk.get('response', ''))
+                    parts.append(chunk.get('response', ''))
+                    if chunk.get('done'):
+                        break
+                    # Stop as soon as the signature is written instead of exhausting num_predict
+                    if "Sincerely, Sami Farhat" in "".join(parts[-16:]):
+                        break
+        
+        cover_letter = "".join(parts).strip()
+        
+        # Post-process to fix signature if needed
+        if "[Your Name]" in cover_letter:
+            cover_letter = cover_letter.replace("[Your Name]", "Sami Farhat")
+            print("Fixed signature in cover letter")
+            with open(output_path, "w") as out:
+                out.write(cover_letter)
+        
+        # Print the result
+        print("Generated Cover Letter:")
+        print("=" * 50)
+        print(cover_letter)
+        print("=" * 50)
+        
+        # Print generation time
+        end_time = time.time()
+        print(f"\nGeneration took {end_time - start_time:.2f} seconds")
+        print(f"Cover letter saved to {output_path}")
     except Exception as e:
         print(f"❌ Error generating cover letter: {str(e)}")
 
@@ -1,11 +1,21 @@
 import os
+import sys
 import requests
 from dotenv import load_dotenv
 from loguru import logger
 
+# Add the parent directory to the path so we can import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.utils import fetch_ollama_tags
+
 # Load environment variables
 load_dotenv()
 
+# Reuse one keep-alive connection for every request to Ollama
+SESSION = requests.Session()
+SESSION.headers['Connection'] = 'keep-alive'
+
 # Get Ollama host from environment or use default
 ollama_host = os.environ.get('OLLAMA_HOST', 'http://localhost:11434')
 ollama_model = "mistral:latest"  # Using Mistral model with tag
@@ -17,13 +27,12 @@ def check_ollama_available():
         url = f"{ollama_host}/api/tags"
         print(f"Checking Ollama at {url}...")
         
-        response = requests.get(url)
+        status_code, models = fetch_ollama_tags(ollama_host, SESSION)
         
-        if response.status_code == 200:
+        if status_code == 200:
             print("✅ Ollama server is running!")
             
             # Get available models
-            models = response.json().get('models', [])
             if models:
                 print("\nAvailable models:")
                 for model in models:
@@ -34,7 +43,7 @@ def check_ollama_available():
             
             return True
         else:
-            print(f"❌ Ollama server returned status code: {response.status_code}")
+            print(f"❌ Ollama server returned status code: {status_code}")
             return False
     except Exception as e:
         print(f"❌ Error connecting to Ollama: {str(e)}")
@@ -49,10 +58,8 @@ def test_ollama_generation():
     if not check_ollama_available():
         return
     
-    # Check if the model exists
-    url = f"{ollama_host}/api/tags"
-    response = requests.get(url)
-    models = response.json().get('models', [])
+    # Check if the model exists (reuses the model list fetched above)
+    _, models = fetch_ollama_tags(ollama_host, SESSION)
     
     if not any(model.get('name') == ollama_model for model in models):
         print(f"\n❌ Model '{ollama_model}' not found. Pulling it now...")
@@ -74,7 +81,7 @@ def test_ollama_generation():
             }
         }
         
-        response = requests.post(url, json=payload)
+        response = SESSION.post(url, json=payload)
         
         if response.status_code == 200:
             result = response.json()
@@ -1,116 +1,143 @@
 #!/usr/bin/env python3
 import os
 import sys
+import json
+import stat
 import platform
 import subprocess
-import requests
-from dotenv import load_dotenv
+import importlib.util
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the parent directory to the path so we can import from src
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-# Load environment variables
-load_dotenv()
-
 def check_python_version():
     """Check Python version."""
+    lines = []
     version = platform.python_version()
-    print(f"Python version: {version}")
+    lines.append(f"Python version: {version}")
     if version < "3.8":
-        print("❌ Python version is too old. Please use Python 3.8 or newer.")
+        lines.append("❌ Python version is too old. Please use Python 3.8 or newer.")
     else:
-        print("✅ Python version is sufficient.")
-    print()
+        lines.append("✅ Python version is sufficient.")
+    lines.append("")
+    
+    return lines
 
 def check_dependencies():
     """Check if required packages are installed."""
-    required_packages = [
-        "beautifulsoup4",
-        "playwright",
-        "pyyaml",
-        "python-docx",
-        "numpy",
-        "pandas",
-        "requests",
-        "loguru",
-        "PyPDF2",
-        "python-dotenv",
-        "ollama"
-    ]
-    
-    print("Checking required packages:")
-    
-    for package in required_packages:
+    lines = []
+    # Map pip package names to their import names
+    required_packages = {
+        "beautifulsoup4": "bs4",
+        "playwright": "playwright",
+        "pyyaml": "yaml",
+        "python-docx": "docx",
+        "numpy": "numpy",
+        "pandas": "pandas",
+        "requests": "requests",
+        "loguru": "loguru",
+        "PyPDF2": "PyPDF2",
+        "python-dotenv": "dotenv",
+        "ollama": "ollama"
+    }
+    
+    lines.append("Checking required packages:")
+    
+    for package, module in required_packages.items():
+        # Locate the module without executing it
         try:
-            __import__(package.replace("-", "_"))
-            print(f"✅ {package} is installed.")
-        except ImportError:
-            print(f"❌ {package} is not installed. Run: pip install {package}")
+            installed = importlib.util.find_spec(module) is not None
+        except ValueError:
+            try:
+                __import__(module)
+                installed = True
+            except ImportError:
+                installed = False
+        
+        if installed:
+            lines.append(f"✅ {package} is installed.")
+        else:
+            lines.append(f"❌ {package} is not installed. Run: pip install {package}")
+    
+    lines.append("")
     
-    print()
+    return lines
 
 def check_playwright():
     """Check if Playwright browsers are installed."""
+    lines = []
+    browsers = ["chromium", "firefox", "webkit"]
     try:
-        result = subprocess.run(["playwright", "install", "--help"], 
+        # Check the CLI and all browsers with a single dry run
+        result = subprocess.run(["playwright", "install", "--dry-run"] + browsers, 
                                stdout=subprocess.PIPE, 
                                stderr=subprocess.PIPE, 
                                text=True)
         if result.returncode == 0:
-            print("✅ Playwright is installed.")
+            lines.append("✅ Playwright is installed.")
             
-            # Check if browsers are installed
-            browsers = ["chromium", "firefox", "webkit"]
+            # Check each browser's section of the combined output
+            # This is a simple check - it doesn't guarantee the browser is fully installed
+            output = result.stdout + result.stderr
             for browser in browsers:
-                try:
-                    # This is a simple check - it doesn't guarantee the browser is fully installed
-                    result = subprocess.run(["playwright", "install", browser, "--dry-run"], 
-                                          stdout=subprocess.PIPE, 
-                                          stderr=subprocess.PIPE, 
-                                          text=True)
-                    if "already installed" in result.stdout or "already installed" in result.stderr:
-                        print(f"✅ Playwright {browser} is installed.")
-                    else:
-                        print(f"❓ Playwright {browser} may not be installed. Run: playwright install {browser}")
-                except Exception:
-                    print(f"❓ Could not check if Playwright {browser} is installed.")
+                start = output.find(f"browser: {browser}")
+                if start == -1:
+                    lines.append(f"❓ Could not check if Playwright {browser} is installed.")
+                    continue
+                
+                end = output.find("browser: ", start + 1)
+                section = output[start:end] if end != -1 else output[start:]
+                if section.find("already installed") != -1:
+                    lines.append(f"✅ Playwright {browser} is installed.")
+                else:
+                    lines.append(f"❓ Playwright {browser} may not be installed. Run: playwright install {browser}")
         else:
-            print("❌ Playwright CLI is not installed properly.")
+            lines.append("❌ Playwright CLI is not installed properly.")
     except FileNotFoundError:
-        print("❌ Playwright is not installed. Run: pip install playwright && playwright install")
+        lines.append("❌ Playwright is not installed. Run: pip install playwright && playwright install")
     
-    print()
+    lines.append("")
+    
+    return lines
 
 def check_ollama():
     """Check if Ollama is available."""
+    lines = []
     ollama_host = os.environ.get('OLLAMA_HOST', 'http://localhost:11434')
-    print(f"Checking Ollama at {ollama_host}...")
+    lines.append(f"Checking Ollama at {ollama_host}...")
     
     try:
-        response = requests.get(f"{ollama_host}/api/tags")
+        # Use a short timeout so an unreachable server doesn't stall the check
+        with urllib.request.urlopen(f"{ollama_host}/api/tags", timeout=2.0) as response:
+            data = json.load(response)
         
-        if response.status_code == 200:
-            print("✅ Ollama server is running.")
-            
-            # Check available models
-            models = response.json().get('models', [])
-            if models:
-                print("Available models:")
-                for model in models:
-                    print(f"  - {model.get('name')}")
-            else:
-                print("❌ No models found in Ollama.")
-                print("   Run: ollama pull mistral:latest")
+        lines.append("✅ Ollama server is running.")
+        
+        # Check available models
+        models = data.get('models', [])
+        if models:
+            lines.append("Available models:")
+            for model in models:
+                lines.append(f"  - {model.get('name')}")
         else:
-            print(f"❌ Ollama server returned status code: {response.status_code}")
+            lines.append("❌ No models found in Ollama.")
+            lines.append("   Run: ollama pull mistral:latest")
+    except urllib.error.HTTPError as e:
+        lines.append(f"❌ Ollama server returned status code: {e.code}")
     except Exception as e:
-        print(f"❌ Error connecting to Ollama: {str(e)}")
-        print("   Make sure Ollama is installed and running.")
+        lines.append(f"❌ Error connecting to Ollama: {str(e)}")
+        lines.append("   Make sure Ollama is installed and running.")
+    
+    lines.append("")
     
-    print()
+    return lines
 
 def check_directories():
     """Check if required directories exist."""
+    lines = []
     required_dirs = [
         "config",
         "data",
@@ -118,72 +145,98 @@ def check_directories():
         "logs"
     ]
     
-    print("Checking required directories:")
+    lines.append("Checking required directories:")
     
     for directory in required_dirs:
-        if os.path.exists(directory) and os.path.isdir(directory):
-            print(f"✅ {directory} exists.")
+        # A single stat tells us whether the directory exists
+        try:
+            existed = stat.S_ISDIR(os.stat(directory).st_mode)
+        except FileNotFoundError:
+            existed = False
+        
+        if existed:
+            lines.append(f"✅ {directory} exists.")
         else:
-            print(f"❌ {directory} does not exist. Creating it...")
+            lines.append(f"❌ {directory} does not exist. Creating it...")
             try:
                 os.makedirs(directory, exist_ok=True)
-                print(f"  ✅ Created {directory}.")
+                lines.append(f"  ✅ Created {directory}.")
             except Exception as e:
-                print(f"  ❌ Error creating {directory}: {str(e)}")
+                lines.append(f"  ❌ Error creating {directory}: {str(e)}")
+    
+    lines.append("")
     
-    print()
+    return lines
 
 def check_config_files():
     """Check if required configuration files exist."""
+    lines = []
     config_file = "config/config.yaml"
     example_config = "config/config.yaml.example"
     
-    print("Checking configuration files:")
+    lines.append("Checking configuration files:")
     
     if os.path.exists(config_file):
-        print(f"✅ {config_file} exists.")
+        lines.append(f"✅ {config_file} exists.")
     else:
-        print(f"❌ {config_file} does not exist.")
+        lines.append(f"❌ {config_file} does not exist.")
         
         if os.path.exists(example_config):
-            print(f"  ℹ️ You can copy {example_config} to {config_file}.")
+            lines.append(f"  ℹ️ You can copy {example_config} to {config_file}.")
         else:
-            print(f"  ❌ {example_config} does not exist either.")
+            lines.append(f"  ❌ {example_config} does not exist either.")
     
-    print()
+    lines.append("")
+    
+    return lines
 
 def check_resume_files():
     """Check if resume and cover letter files exist."""
+    lines = []
     resume_file = "data/resume.pdf"
     cover_letter_file = "data/base_cover_letter.pdf"
     
-    print("Checking resume and cover letter files:")
+    lines.append("Checking resume and cover letter files:")
     
     if os.path.exists(resume_file):
-        print(f"✅ {resume_file} exists.")
+        lines.append(f"✅ {resume_file} exists.")
     else:
-        print(f"❌ {resume_file} does not exist. Please add your resume.")
+        lines.append(f"❌ {resume_file} does not exist. Please add your resume.")
     
     if os.path.exists(cover_letter_file):
-        print(f"✅ {cover_letter_file} exists.")
+        lines.append(f"✅ {cover_letter_file} exists.")
     else:
-        print(f"❌ {cover_letter_file} does not exist. Please add your base cover letter.")
+        lines.append(f"❌ {cover_letter_file} does not exist. Please add your base cover letter.")
+    
+    lines.append("")
     
-    print()
+    return lines
 
 def main():
     """Run all checks."""
     print("=== System Check ===\n")
     
-    check_python_version()
-    check_dependencies()
-    check_playwright()
-    check_ollama()
-    check_directories()
-    check_config_files()
-    check_resume_files()
+    checks = [
+        check_python_version,
+        check_dependencies,
+        check_playwright,
+        check_ollama,
+        check_directories,
+        check_config_files,
+        check_resume_files
+    ]
+    
+    # Run the checks concurrently and print their output in a fixed order
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(check) for check in checks]
+        for future in futures:
+            print("\n".join(future.result()))
     
     print("=== System Check Complete ===")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    # Load environment variables
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    main()
\ No newline at end of file
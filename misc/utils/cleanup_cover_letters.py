@@ -7,13 +7,14 @@ from datetime import datetime, timedelta
 # Add the parent directory to the path so we can import from src
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-def cleanup_cover_letters(days_old=7, dry_run=True):
+def cleanup_cover_letters(days_old=7, dry_run=True, verbose=True):
     """
     Clean up cover letter files older than the specified number of days.
     
     Args:
         days_old (int): Remove files older than this many days
         dry_run (bool): If True, only print what would be deleted without actually deleting
+        verbose (bool): If True, print each deleted file
     """
     cover_letter_dir = "data/cover_letters"
     
@@ -23,6 +24,7 @@ def cleanup_cover_letters(days_old=7, dry_run=True):
     
     # Calculate the cutoff date
     cutoff_date = datetime.now() - timedelta(days=days_old)
+    cutoff_timestamp = cutoff_date.timestamp()
     
     # Count files
     total_files = 0
@@ -30,29 +32,30 @@ def cleanup_cover_letters(days_old=7, dry_run=True):
     
     print(f"{'[DRY RUN] ' if dry_run else ''}Cleaning up cover letters older than {days_old} days ({cutoff_date.strftime('%Y-%m-%d')})")
     
-    for filename in os.listdir(cover_letter_dir):
-        file_path = os.path.join(cover_letter_dir, filename)
-        
-        # Skip directories
-        if os.path.isdir(file_path):
-            continue
-        
-        total_files += 1
-        
-        # Get file modification time
-        file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-        
-        # Check if file is older than cutoff date
-        if file_time < cutoff_date:
+    with os.scandir(cover_letter_dir) as entries:
+        for entry in entries:
+            # Skip directories
+            if entry.is_dir(follow_symlinks=False):
+                continue
+            
+            total_files += 1
+            
+            # Skip files newer than the cutoff date
+            mtime = entry.stat(follow_symlinks=False).st_mtime
+            if mtime >= cutoff_timestamp:
+                continue
+            
             if dry_run:
-                print(f"Would delete: {filename} (modified: {file_time.strftime('%Y-%m-%d %H:%M:%S')})")
+                print(f"Would delete: {entry.name} (modified: {datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S')})")
             else:
                 try:
-                    os.remove(file_path)
-                    print(f"Deleted: {filename} (modified: {file_time.strftime('%Y-%m-%d %H:%M:%S')})")
+                    os.unlink(entry.path)
                 except Exception as e:
-                    print(f"Error deleting {filename}: {str(e)}")
+                    print(f"Error deleting {entry.name}: {str(e)}")
                     continue
+                
+                if verbose:
+                    print(f"Deleted: {entry.name} (modified: {datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S')})")
             
             deleted_files += 1
     
@@ -69,7 +72,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Clean up old cover letter files")
     parser.add_argument("--days", type=int, default=7, help="Delete files older than this many days")
     parser.add_argument("--force", action="store_true", help="Actually delete files (without this flag, it's a dry run)")
+    parser.add_argument("--quiet", action="store_true", help="Don't list each deleted file")
     
     args = parser.parse_args()
     
-    cleanup_cover_letters(days_old=args.days, dry_run=not args.force) 
\ No newline at end of file
+    cleanup_cover_letters(days_old=args.days, dry_run=not args.force, verbose=not args.quiet) 
\ No newline at end of file
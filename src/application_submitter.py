@@ -1,13 +1,90 @@
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+import re
 import time
 import random
 from loguru import logger
 import os
 
+# Split Playwright text selectors into a CSS part and the text to match
+HAS_TEXT_RE = re.compile(r'^(.*):has-text\("(.*)"\)$')
+
+# Report which selectors match on the page in a single round trip
+PROBE_SELECTORS_JS = '''(probes) => probes.map(([css, text]) => {
+    if (text === null) return !!document.querySelector(css);
+    return Array.from(document.querySelectorAll(css)).some(el => el.textContent.toLowerCase().includes(text));
+})'''
+
+# Fill each empty field in the page and report what happened to it
+FILL_FIELDS_JS = '''(pairs) => pairs.map(([selector, value]) => {
+    const el = document.querySelector(selector);
+    if (!el) return 'missing';
+    if (el.value) return 'kept';
+    // Use the native setter so frameworks like React see the new value
+    const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    return 'filled';
+})'''
+
+# Alternatives in order of preference; the first one present on the page wins
+APPLY_SELECTORS = [
+    'button:has-text("Apply")',
+    'a:has-text("Apply")',
+    'button:has-text("Apply Now")',
+    'a:has-text("Apply Now")',
+    'input[type="submit"][value="Apply"]'
+]
+RESUME_SELECTORS = [
+    'input[type="file"][name="resume"]',
+    'input[type="file"][accept=".pdf,.doc,.docx"]',
+    'input[type="file"]:not([name="coverLetter"])'
+]
+SUBMIT_SELECTORS = [
+    'button[type="submit"]',
+    'input[type="submit"]',
+    'button:has-text("Submit")',
+    'button:has-text("Apply")',
+    'a:has-text("Submit Application")'
+]
+
 class ApplicationSubmitter:
     def __init__(self, config, captcha_handler):
         self.config = config
         self.captcha_handler = captcha_handler
+        # Some sites only accept input typed through Playwright
+        self.typed_fill = config['browser'].get('typed_fill', False)
+        
+        # The browser is started on first use and kept open until close() or the end of a with block
+        self._pw = None
+        self._browser = None
+    
+    def _get_browser(self):
+        """Start Playwright and launch the browser on first use."""
+        if self._browser is None:
+            # Playwright is only loaded when an application is actually submitted
+            from playwright.sync_api import sync_playwright
+            
+            self._pw = sync_playwright().start()
+            self._browser = self._pw.chromium.launch(
+                headless=self.config['browser']['headless']
+            )
+        return self._browser
+    
+    def close(self):
+        """Close the shared browser and stop Playwright."""
+        if self._browser is not None:
+            self._browser.close()
+            self._browser = None
+        if self._pw is not None:
+            self._pw.stop()
+            self._pw = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+        return False
     
     def submit_application(self, job, resume_path, cover_letter_path):
         """Submit job application through the job portal."""
@@ -17,106 +94,106 @@ class ApplicationSubmitter:
             logger.error("No application URL provided")
             return False
         
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=self.config['browser']['headless']
-            )
-            context = browser.new_context(
-                user_agent=self.config['browser']['user_agent'],
-                viewport={'width': self.config['browser']['viewport_width'], 
-                          'height': self.config['browser']['viewport_height']}
-            )
+        # Read the cover letter once for every form that needs it
+        cover_letter_text = None
+        if cover_letter_path and os.path.exists(cover_letter_path):
+            with open(cover_letter_path, 'r') as f:
+                cover_letter_text = f.read()
+        
+        browser = self._get_browser()
+        context = browser.new_context(
+            user_agent=self.config['browser']['user_agent'],
+            viewport={'width': self.config['browser']['viewport_width'], 
+                      'height': self.config['browser']['viewport_height']}
+        )
+        
+        page = context.new_page()
+        
+        try:
+            # Navigate to job application page
+            logger.info(f"Navigating to {job['url']}")
+            page.goto(job['url'])
+            page.wait_for_load_state("networkidle")
             
-            # Add human-like behavior
-            self._add_human_behavior(context)
+            # Detect application form type
+            if "linkedin.com" in job['url']:
+                success = self._apply_linkedin(page, job, resume_path, cover_letter_path, cover_letter_text)
+            elif "indeed.com" in job['url']:
+                success = self._apply_indeed(page, job, resume_path, cover_letter_path, cover_letter_text)
+            else:
+                success = self._apply_generic(page, job, resume_path, cover_letter_path, cover_letter_text)
             
-            page = context.new_page()
+            if success:
+                logger.success(f"Successfully submitted application to {job['company']}")
+            else:
+                logger.warning(f"Could not complete application for {job['company']}")
             
-            try:
-                # Navigate to job application page
-                logger.info(f"Navigating to {job['url']}")
-                page.goto(job['url'])
-                page.wait_for_load_state("networkidle")
-                
-                # Detect application form type
-                if "linkedin.com" in job['url']:
-                    success = self._apply_linkedin(page, job, resume_path, cover_letter_path)
-                elif "indeed.com" in job['url']:
-                    success = self._apply_indeed(page, job, resume_path, cover_letter_path)
-                else:
-                    success = self._apply_generic(page, job, resume_path, cover_letter_path)
-                
-                if success:
-                    logger.success(f"Successfully submitted application to {job['company']}")
-                else:
-                    logger.warning(f"Could not complete application for {job['company']}")
-                
-                return success
-                
-            except Exception as e:
-                logger.error(f"Error submitting application: {str(e)}")
-                # Take screenshot of error
-                page.screenshot(path=f"logs/error_{job['company'].replace(' ', '_')}_{int(time.time())}.png")
-                return False
-            finally:
-                browser.close()
-    
-    def _add_human_behavior(self, context):
-        """Add human-like behavior to browser context."""
-        # Add random mouse movements and delays
-        context.route("**/*", lambda route: self._human_interaction(route))
+            return success
+            
+        except Exception as e:
+            logger.error(f"Error submitting application: {str(e)}")
+            # Take screenshot of error
+            page.screenshot(path=f"logs/error_{job['company'].replace(' ', '_')}_{int(time.time())}.png")
+            return False
+        finally:
+            context.close()
     
-    def _human_interaction(self, route):
-        """Simulate human interaction patterns."""
-        # Continue with the request
-        route.continue_()
-        # Add random delay to simulate human thinking
-        if random.random() < 0.3:  # 30% chance of delay
-            time.sleep(random.uniform(0.5, 2.0))
+    def _human_pause(self, page):
+        """Pause before a user action to simulate human thinking."""
+        page.wait_for_timeout(random.uniform(500, 2000))
     
-    def _apply_linkedin(self, page, job, resume_path, cover_letter_path):
+    def _apply_linkedin(self, page, job, resume_path, cover_letter_path, cover_letter_text):
         """Apply to job on LinkedIn."""
         try:
             # Check if we need to log in
             if page.query_selector(".artdeco-button__text:has-text('Sign in')"):
                 logger.info("LinkedIn login required")
+                self._human_pause(page)
                 page.click(".artdeco-button__text:has-text('Sign in')")
                 page.wait_for_selector("#username")
                 
                 # Login
                 page.fill("#username", self.config['job_boards']['linkedin']['username'])
                 page.fill("#password", self.config['job_boards']['linkedin']['password'])
+                self._human_pause(page)
                 page.click("button[type='submit']")
-                page.wait_for_load_state("networkidle")
+                page.wait_for_load_state("domcontentloaded")
             
             # Look for Easy Apply button
             easy_apply_button = page.query_selector("button.jobs-apply-button")
             if easy_apply_button:
                 logger.info("Found Easy Apply button")
+                self._human_pause(page)
                 easy_apply_button.click()
                 page.wait_for_selector(".jobs-easy-apply-content")
                 
                 # Handle multi-step application
+                step_button = page.locator("button.artdeco-button--primary").filter(has_text=re.compile("Next|Submit application")).first
                 while True:
-                    # Check for next button
-                    next_button = page.query_selector("button.artdeco-button--primary:has-text('Next')")
-                    submit_button = page.query_selector("button.artdeco-button--primary:has-text('Submit application')")
+                    # Wait for whichever of the Next or Submit buttons appears
+                    try:
+                        step_button.wait_for(state="visible", timeout=10000)
+                        button_text = step_button.text_content() or ""
+                    except Exception:
+                        button_text = ""
                     
-                    if submit_button:
+                    if "Submit application" in button_text:
                         logger.info("Found Submit button - completing application")
-                        submit_button.click()
+                        self._human_pause(page)
+                        step_button.click()
                         page.wait_for_selector(".artdeco-modal__dismiss", timeout=10000)
                         page.click(".artdeco-modal__dismiss")
                         return True
                     
-                    if next_button:
+                    if "Next" in button_text:
                         # Fill in any visible form fields
-                        self._fill_linkedin_form(page, job, resume_path, cover_letter_path)
+                        self._fill_linkedin_form(page, job, resume_path, cover_letter_path, cover_letter_text)
                         
                         # Click Next
                         logger.info("Clicking Next button")
-                        next_button.click()
-                        page.wait_for_load_state("networkidle")
+                        self._human_pause(page)
+                        step_button.click()
+                        page.wait_for_load_state("domcontentloaded")
                         time.sleep(random.uniform(1, 2))
                     else:
                         # No next or submit button found
@@ -130,7 +207,7 @@ class ApplicationSubmitter:
             logger.error(f"Error in LinkedIn application: {str(e)}")
             return False
     
-    def _fill_linkedin_form(self, page, job, resume_path, cover_letter_path):
+    def _fill_linkedin_form(self, page, job, resume_path, cover_letter_path, cover_letter_text):
         """Fill in LinkedIn application form fields."""
         try:
             # Check for resume upload
@@ -141,15 +218,15 @@ class ApplicationSubmitter:
                 time.sleep(random.uniform(1, 2))
             
             # Check for common form fields
-            self._fill_form_field(page, '#email-address', self.config['user']['email'])
-            self._fill_form_field(page, '#phone-number', self.config['user']['phone'])
+            self._fill_fields_batch(page, [
+                ('#email-address', self.config['user']['email']),
+                ('#phone-number', self.config['user']['phone'])
+            ])
             
             # Check for cover letter text area
             cover_letter_field = page.query_selector('textarea[name="coverLetter"]')
-            if cover_letter_field:
+            if cover_letter_field and cover_letter_text:
                 logger.info("Adding cover letter")
-                with open(cover_letter_path, 'r') as f:
-                    cover_letter_text = f.read()
                 cover_letter_field.fill(cover_letter_text)
                 time.sleep(random.uniform(1, 2))
             
@@ -161,26 +238,28 @@ class ApplicationSubmitter:
         except Exception as e:
             logger.error(f"Error filling LinkedIn form: {str(e)}")
     
-    def _apply_indeed(self, page, job, resume_path, cover_letter_path):
+    def _apply_indeed(self, page, job, resume_path, cover_letter_path, cover_letter_text):
         """Apply to job on Indeed."""
         try:
             # Check for Apply button
             apply_button = page.query_selector('button:has-text("Apply now")')
             if apply_button:
                 logger.info("Found Apply button")
+                self._human_pause(page)
                 apply_button.click()
-                page.wait_for_load_state("networkidle")
+                page.wait_for_load_state("domcontentloaded")
                 
                 # Check if we need to log in
                 if page.query_selector('#login-email-input'):
                     logger.info("Indeed login required")
                     page.fill('#login-email-input', self.config['user']['email'])
                     page.fill('#login-password-input', self.config['user']['password'])
+                    self._human_pause(page)
                     page.click('button[type="submit"]')
-                    page.wait_for_load_state("networkidle")
+                    page.wait_for_load_state("domcontentloaded")
                 
                 # Fill application form
-                self._fill_indeed_form(page, job, resume_path, cover_letter_path)
+                self._fill_indeed_form(page, job, resume_path, cover_letter_path, cover_letter_text)
                 
                 # Look for continue/submit buttons
                 continue_button = page.query_selector('button:has-text("Continue")')
@@ -188,15 +267,17 @@ class ApplicationSubmitter:
                 
                 if submit_button:
                     logger.info("Submitting application")
+                    self._human_pause(page)
                     submit_button.click()
                     page.wait_for_load_state("networkidle")
                     return True
                 elif continue_button:
                     logger.info("Continuing application")
+                    self._human_pause(page)
                     continue_button.click()
-                    page.wait_for_load_state("networkidle")
+                    page.wait_for_load_state("domcontentloaded")
                     # Recursively handle multi-page applications
-                    return self._apply_indeed(page, job, resume_path, cover_letter_path)
+                    return self._apply_indeed(page, job, resume_path, cover_letter_path, cover_letter_text)
                 else:
                     logger.warning("Could not find Continue or Submit button")
                     return False
@@ -208,7 +289,7 @@ class ApplicationSubmitter:
             logger.error(f"Error in Indeed application: {str(e)}")
             return False
     
-    def _fill_indeed_form(self, page, job, resume_path, cover_letter_path):
+    def _fill_indeed_form(self, page, job, resume_path, cover_letter_path, cover_letter_text):
         """Fill in Indeed application form fields."""
         try:
             # Check for resume upload
@@ -219,16 +300,16 @@ class ApplicationSubmitter:
                 time.sleep(random.uniform(1, 2))
             
             # Check for common form fields
-            self._fill_form_field(page, 'input[name="name"]', self.config['user']['name'])
-            self._fill_form_field(page, 'input[name="email"]', self.config['user']['email'])
-            self._fill_form_field(page, 'input[name="phoneNumber"]', self.config['user']['phone'])
+            self._fill_fields_batch(page, [
+                ('input[name="name"]', self.config['user']['name']),
+                ('input[name="email"]', self.config['user']['email']),
+                ('input[name="phoneNumber"]', self.config['user']['phone'])
+            ])
             
             # Check for cover letter text area
             cover_letter_field = page.query_selector('textarea[name="coverLetter"]')
-            if cover_letter_field:
+            if cover_letter_field and cover_letter_text:
                 logger.info("Adding cover letter")
-                with open(cover_letter_path, 'r') as f:
-                    cover_letter_text = f.read()
                 cover_letter_field.fill(cover_letter_text)
                 time.sleep(random.uniform(1, 2))
             
@@ -240,45 +321,30 @@ class ApplicationSubmitter:
         except Exception as e:
             logger.error(f"Error filling Indeed form: {str(e)}")
     
-    def _apply_generic(self, page, job, resume_path, cover_letter_path):
+    def _apply_generic(self, page, job, resume_path, cover_letter_path, cover_letter_text):
         """Apply to job on a generic job board."""
         try:
             # Look for common application buttons
-            apply_buttons = [
-                'button:has-text("Apply")',
-                'a:has-text("Apply")',
-                'button:has-text("Apply Now")',
-                'a:has-text("Apply Now")',
-                'input[type="submit"][value="Apply"]'
-            ]
-            
-            for button_selector in apply_buttons:
-                apply_button = page.query_selector(button_selector)
-                if apply_button:
-                    logger.info(f"Found Apply button: {button_selector}")
-                    apply_button.click()
-                    page.wait_for_load_state("networkidle")
-                    break
+            apply_selector, = self._probe_selectors(page, [APPLY_SELECTORS])
+            if apply_selector:
+                logger.info("Found Apply button")
+                self._human_pause(page)
+                page.locator(apply_selector).first.click()
+                page.wait_for_load_state("domcontentloaded")
             
             # Look for common form fields
-            self._fill_form_field(page, 'input[name="name"], input[name="fullName"], input[id="name"]', self.config['user']['name'])
-            self._fill_form_field(page, 'input[name="email"], input[type="email"], input[id="email"]', self.config['user']['email'])
-            self._fill_form_field(page, 'input[name="phone"], input[type="tel"], input[id="phone"]', self.config['user']['phone'])
+            self._fill_fields_batch(page, [
+                ('input[name="name"], input[name="fullName"], input[id="name"]', self.config['user']['name']),
+                ('input[name="email"], input[type="email"], input[id="email"]', self.config['user']['email']),
+                ('input[name="phone"], input[type="tel"], input[id="phone"]', self.config['user']['phone'])
+            ])
             
             # Check for resume upload
-            resume_selectors = [
-                'input[type="file"][name="resume"]',
-                'input[type="file"][accept=".pdf,.doc,.docx"]',
-                'input[type="file"]'
-            ]
-            
-            for selector in resume_selectors:
-                resume_upload = page.query_selector(selector)
-                if resume_upload:
-                    logger.info("Uploading resume")
-                    resume_upload.set_input_files(resume_path)
-                    time.sleep(random.uniform(1, 2))
-                    break
+            resume_selector, = self._probe_selectors(page, [RESUME_SELECTORS])
+            if resume_selector:
+                logger.info("Uploading resume")
+                page.locator(resume_selector).first.set_input_files(resume_path)
+                time.sleep(random.uniform(1, 2))
             
             # Check for cover letter upload or text area
             cover_letter_selectors = [
@@ -287,35 +353,25 @@ class ApplicationSubmitter:
                 'input[type="file"][name="coverLetter"]'
             ]
             
-            for selector in cover_letter_selectors:
-                cover_letter_field = page.query_selector(selector)
-                if cover_letter_field:
-                    logger.info("Adding cover letter")
-                    if 'input[type="file"]' in selector:
-                        cover_letter_field.set_input_files(cover_letter_path)
-                    else:
-                        with open(cover_letter_path, 'r') as f:
-                            cover_letter_text = f.read()
-                        cover_letter_field.fill(cover_letter_text)
-                    time.sleep(random.uniform(1, 2))
-                    break
+            # The matching selector decides between upload and text, so probe them individually
+            cover_letter_selector, = self._probe_selectors(page, [cover_letter_selectors])
+            cover_letter_field = page.query_selector(cover_letter_selector) if cover_letter_selector else None
+            if cover_letter_field and cover_letter_text:
+                logger.info("Adding cover letter")
+                if 'input[type="file"]' in cover_letter_selector:
+                    cover_letter_field.set_input_files(cover_letter_path)
+                else:
+                    cover_letter_field.fill(cover_letter_text)
+                time.sleep(random.uniform(1, 2))
             
             # Look for submit button
-            submit_selectors = [
-                'button[type="submit"]',
-                'input[type="submit"]',
-                'button:has-text("Submit")',
-                'button:has-text("Apply")',
-                'a:has-text("Submit Application")'
-            ]
-            
-            for selector in submit_selectors:
-                submit_button = page.query_selector(selector)
-                if submit_button:
-                    logger.info(f"Found Submit button: {selector}")
-                    submit_button.click()
-                    page.wait_for_load_state("networkidle")
-                    return True
+            submit_selector, = self._probe_selectors(page, [SUBMIT_SELECTORS])
+            if submit_selector:
+                logger.info("Found Submit button")
+                self._human_pause(page)
+                page.locator(submit_selector).first.click()
+                page.wait_for_load_state("networkidle")
+                return True
             
             logger.warning("Could not find Submit button")
             return False
@@ -324,6 +380,42 @@ class ApplicationSubmitter:
             logger.error(f"Error in generic application: {str(e)}")
             return False
     
+    def _probe_selectors(self, page, groups):
+        """Return the first selector present on the page for each group of selectors."""
+        probes = []
+        for group in groups:
+            for selector in group:
+                match = HAS_TEXT_RE.match(selector)
+                probes.append([match.group(1), match.group(2).lower()] if match else [selector, None])
+        
+        found = iter(page.evaluate(PROBE_SELECTORS_JS, probes))
+        winners = []
+        for group in groups:
+            hits = [next(found) for _ in group]
+            winners.append(next((selector for selector, hit in zip(group, hits) if hit), None))
+        return winners
+    
+    def _fill_fields_batch(self, page, pairs, typed=None):
+        """Fill in every empty form field of (selector, value) pairs in one round trip."""
+        if typed is None:
+            typed = self.typed_fill
+        
+        # Fall back to filling field by field through Playwright
+        if typed:
+            for selector, value in pairs:
+                self._fill_form_field(page, selector, value)
+            return
+        
+        try:
+            results = page.evaluate(FILL_FIELDS_JS, [list(pair) for pair in pairs])
+            for (selector, _), result in zip(pairs, results):
+                if result == 'filled':
+                    logger.info(f"Filled field: {selector}")
+            if 'filled' in results:
+                time.sleep(random.uniform(0.5, 1.5))
+        except Exception as e:
+            logger.error(f"Error filling form fields: {str(e)}")
+    
     def _fill_form_field(self, page, selector, value):
         """Fill in a form field if it exists and is empty."""
         try:
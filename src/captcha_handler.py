@@ -1,14 +1,27 @@
+import sys
 import time
 import os
 from loguru import logger
-from twocaptcha import TwoCaptcha
-from anticaptchaofficial.recaptchav2proxyless import recaptchaV2Proxyless
+
+# Detect the CAPTCHA type and reCAPTCHA site key in a single round trip
+CAPTCHA_STATE_JS = '''() => {
+    const recaptcha = document.querySelector('.g-recaptcha');
+    return {
+        recaptcha: !!recaptcha,
+        site_key: recaptcha ? recaptcha.getAttribute('data-sitekey') : null,
+        hcaptcha: !!document.querySelector('iframe[src*="hcaptcha"]')
+    };
+}'''
 
 class CaptchaHandler:
     def __init__(self, config):
         self.config = config
         self.service = config['captcha']['service']
         self.api_key = config['captcha']['api_key']
+        
+        # Solver classes are imported on first use so only the configured SDK is loaded
+        self._TwoCaptcha = None
+        self._recaptchaV2Proxyless = None
     
     def solve_captcha(self, page):
         """Solve CAPTCHA on the current page."""
@@ -21,10 +34,11 @@ class CaptchaHandler:
         
         try:
             # Detect CAPTCHA type
-            if page.query_selector('.g-recaptcha'):
+            state = page.evaluate(CAPTCHA_STATE_JS)
+            if state['recaptcha']:
                 logger.info("Detected reCAPTCHA")
-                return self._solve_recaptcha(page)
-            elif page.query_selector('iframe[src*="hcaptcha"]'):
+                return self._solve_recaptcha(page, state['site_key'])
+            elif state['hcaptcha']:
                 logger.info("Detected hCaptcha")
                 return self._solve_hcaptcha(page)
             else:
@@ -34,15 +48,9 @@ class CaptchaHandler:
             logger.error(f"Error solving CAPTCHA: {str(e)}")
             return False
     
-    def _solve_recaptcha(self, page):
+    def _solve_recaptcha(self, page, site_key):
         """Solve Google reCAPTCHA."""
         try:
-            # Get site key
-            site_key = page.evaluate('''() => {
-                const recaptchaElement = document.querySelector('.g-recaptcha');
-                return recaptchaElement ? recaptchaElement.getAttribute('data-sitekey') : null;
-            }''')
-            
             if not site_key:
                 logger.error("Could not find reCAPTCHA site key")
                 return False
@@ -66,7 +74,11 @@ class CaptchaHandler:
     def _solve_with_2captcha(self, page, site_key, page_url):
         """Solve CAPTCHA using 2Captcha service."""
         try:
-            solver = TwoCaptcha(self.api_key)
+            if self._TwoCaptcha is None:
+                module = sys.modules.get('twocaptcha') or __import__('twocaptcha', fromlist=['TwoCaptcha'])
+                self._TwoCaptcha = module.TwoCaptcha
+            
+            solver = self._TwoCaptcha(self.api_key)
             logger.info(f"Sending reCAPTCHA to 2Captcha: {site_key}")
             
             result = solver.recaptcha(
@@ -96,7 +108,12 @@ class CaptchaHandler:
     def _solve_with_anticaptcha(self, page, site_key, page_url):
         """Solve CAPTCHA using Anti-Captcha service."""
         try:
-            solver = recaptchaV2Proxyless()
+            if self._recaptchaV2Proxyless is None:
+                module_name = 'anticaptchaofficial.recaptchav2proxyless'
+                module = sys.modules.get(module_name) or __import__(module_name, fromlist=['recaptchaV2Proxyless'])
+                self._recaptchaV2Proxyless = module.recaptchaV2Proxyless
+            
+            solver = self._recaptchaV2Proxyless()
             solver.set_verbose(1)
             solver.set_key(self.api_key)
             solver.set_website_url(page_url)
@@ -1,7 +1,23 @@
 import os
+import re
+import json
 import yaml
+import hashlib
 from loguru import logger
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+CONFIG_PATH = "config/config.yaml"
+
+# The resolved config is cached as msgpack when available, otherwise as JSON
+CONFIG_CACHE_PATH = "config/.config.cache.msgpack" if msgpack is not None else "config/.config.cache.json"
+
+# ${VAR} placeholders substituted from the environment
+_ENV_RE = re.compile(r'\$\{([A-Za-z_][A-Za-z0-9_]*)\}')
+
 def load_config_with_env_vars():
     """Load configuration from YAML file and replace environment variables."""
     try:
@@ -18,39 +34,76 @@ def load_config_with_env_vars():
                 logger.error("No config file or example found!")
                 return None
         
+        # Reuse the resolved config from the last run if neither the file nor its variables changed
+        mtime = os.stat(CONFIG_PATH).st_mtime_ns
+        config = _load_cached_config(mtime)
+        if config is not None:
+            return config
+        
         # Load the config file
-        with open("config/config.yaml", "r") as f:
+        with open(CONFIG_PATH, "r") as f:
             config = yaml.safe_load(f)
         
-        # Replace environment variables in the config
-        _replace_env_vars_in_config(config)
+        # Replace environment variables in the parsed values so substituted text is never re-parsed as YAML
+        env_vars = set()
+        config = _replace_env_vars(config, env_vars)
         
+        _save_cached_config(mtime, sorted(env_vars), config)
         return config
     except Exception as e:
         logger.error(f"Error loading configuration: {str(e)}")
         return None
 
-def _replace_env_vars_in_config(config):
-    """Recursively replace environment variables in config."""
-    if isinstance(config, dict):
-        for key, value in config.items():
-            if isinstance(value, (dict, list)):
-                _replace_env_vars_in_config(value)
-            elif isinstance(value, str) and value.startswith("${") and value.endswith("}"):
-                env_var = value[2:-1]
-                env_value = os.environ.get(env_var)
-                if env_value:
-                    config[key] = env_value
-                else:
-                    logger.warning(f"Environment variable {env_var} not found")
-    elif isinstance(config, list):
-        for i, item in enumerate(config):
-            if isinstance(item, (dict, list)):
-                _replace_env_vars_in_config(item)
-            elif isinstance(item, str) and item.startswith("${") and item.endswith("}"):
-                env_var = item[2:-1]
-                env_value = os.environ.get(env_var)
-                if env_value:
-                    config[i] = env_value
-                else:
-                    logger.warning(f"Environment variable {env_var} not found") 
\ No newline at end of file
+def _replace_env_vars(value, env_vars):
+    """Recursively replace ${VAR} placeholders in string values, recording the names in env_vars."""
+    if isinstance(value, dict):
+        return {key: _replace_env_vars(item, env_vars) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_replace_env_vars(item, env_vars) for item in value]
+    if isinstance(value, str):
+        return _ENV_RE.sub(lambda match: _sub_env_var(match, env_vars), value)
+    return value
+
+def _sub_env_var(match, env_vars):
+    """Return the environment value for a ${VAR} match, leaving unknown variables in place."""
+    env_var = match.group(1)
+    env_vars.add(env_var)
+    env_value = os.environ.get(env_var)
+    if not env_value:
+        logger.warning(f"Environment variable {env_var} not found")
+        return match.group(0)
+    return env_value
+
+def _env_hash(env_vars):
+    """Hash the current values of the environment variables the config references."""
+    values = [(name, os.environ.get(name)) for name in env_vars]
+    return hashlib.blake2b(repr(values).encode(), digest_size=16).hexdigest()
+
+def _load_cached_config(mtime):
+    """Return the cached config if it was resolved from this file version and environment, otherwise None."""
+    if not os.path.exists(CONFIG_CACHE_PATH):
+        return None
+    
+    try:
+        with open(CONFIG_CACHE_PATH, "rb") as f:
+            data = f.read()
+        cached = msgpack.unpackb(data, raw=False) if msgpack is not None else json.loads(data)
+        if cached.get("mtime") == mtime and cached.get("env_hash") == _env_hash(cached.get("env_vars", [])):
+            return cached["config"]
+    except Exception as e:
+        logger.debug(f"Ignoring unreadable config cache: {str(e)}")
+    return None
+
+def _save_cached_config(mtime, env_vars, config):
+    """Write the resolved config to the cache along with what it was resolved against."""
+    cached = {"mtime": mtime, "env_vars": env_vars, "env_hash": _env_hash(env_vars), "config": config}
+    
+    try:
+        data = msgpack.packb(cached, use_bin_type=True) if msgpack is not None else json.dumps(cached).encode()
+        
+        # The resolved config contains credentials, so keep the cache private
+        fd = os.open(CONFIG_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+    except Exception as e:
+        logger.debug(f"Could not write config cache: {str(e)}")
@@ -0,0 +1,229 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import importlib.util
+from loguru import logger
+
+class CoverLetterCache:
+    """Content-addressed on-disk cache of generated cover letters."""
+
+    def __init__(self, cache_directory="data/cover_letter_cache"):
+        self.cache_directory = cache_directory
+        self.manifest_path = os.path.join(cache_directory, "manifest.sqlite")
+        self._lock = threading.Lock()
+
+        # Create cache directory if it doesn't exist
+        os.makedirs(self.cache_directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, path TEXT NOT NULL, created_at INTEGER NOT NULL)"
+            )
+
+    @staticmethod
+    def _digest(*parts):
+        h = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            # Length-prefix each part so different splits of the same text never collide
+            data = (part or "").encode("utf-8")
+            h.update(len(data).to_bytes(8, "little"))
+            h.update(data)
+        return h.hexdigest()
+
+    @staticmethod
+    def make_fingerprint(resume_text, base_cover_letter_text, prompt_version):
+        """Fingerprint the inputs shared by every job, computed once per resume and base cover letter."""
+        return CoverLetterCache._digest(resume_text, base_cover_letter_text, prompt_version)
+
+    @staticmethod
+    def make_key(fingerprint, job_description):
+        """Build the cache key for a job description under a content fingerprint."""
+        return CoverLetterCache._digest(fingerprint, job_description)
+
+    def _connect(self):
+        return sqlite3.connect(self.manifest_path)
+
+    def get(self, key):
+        """Return the path of the cached cover letter for key, or None on a miss."""
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT path FROM entries WHERE key = ?", (key,)).fetchone()
+
+        if row and os.path.exists(row[0]):
+            return row[0]
+        return None
+
+    def put(self, key, content):
+        """Store cover letter content under key and return its cache path."""
+        path = os.path.join(self.cache_directory, f"{key}.txt")
+
+        try:
+            with open(path, 'w') as f:
+                f.write(content)
+
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, path, created_at) VALUES (?, ?, ?)",
+                    (key, path, int(time.time()))
+                )
+
+            logger.debug(f"Cached cover letter under {key}")
+            return path
+        except Exception as e:
+            logger.error(f"Error caching cover letter: {str(e)}")
+            return None
+
+
+class SemanticCoverLetterCache:
+    """Reuse cover letters generated from the same inputs for near-duplicate job descriptions."""
+
+    def __init__(self, config, cache_directory="data/cover_letter_cache/semantic"):
+        self.threshold = config.get('llm', {}).get('semantic_cache_threshold', 0.92)
+        self.model_name = config.get('llm', {}).get('embedding_model', 'sentence-transformers/all-MiniLM-L6-v2')
+        self.cache_directory = cache_directory
+        self.vectors_path = os.path.join(cache_directory, "vectors.npy")
+        self.entries_path = os.path.join(cache_directory, "entries.json")
+        self._lock = threading.Lock()
+        self._model = None
+        self._index = None  # (fingerprint, index over that fingerprint's entries, their positions)
+        self._vectors = None
+        self._entries = None
+        self._keys = set()  # Exact cache keys of the indexed entries
+        self._dirty = False
+        self.enabled = True
+
+        # Only check that the dependencies exist; importing sentence-transformers loads torch
+        if any(importlib.util.find_spec(name) is None for name in ("faiss", "numpy", "sentence_transformers")):
+            logger.info("faiss or sentence-transformers not installed. Semantic cover letter cache disabled.")
+            self.enabled = False
+            return
+
+        os.makedirs(self.cache_directory, exist_ok=True)
+
+    def _embed(self, text):
+        """Embed text as an L2-normalized float32 row vector."""
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        return self._model.encode([text or ""], normalize_embeddings=True).astype("float32")
+
+    def _load_entries(self):
+        """Load the persisted vectors and entries on first use."""
+        if self._entries is not None:
+            return
+
+        import numpy as np
+
+        if os.path.exists(self.vectors_path) and os.path.exists(self.entries_path):
+            self._vectors = np.load(self.vectors_path)
+            with open(self.entries_path, 'r') as f:
+                self._entries = json.load(f)
+        else:
+            self._vectors = np.zeros((0, 0), dtype="float32")
+            self._entries = []
+        self._keys = {entry.get('key') for entry in self._entries}
+
+    def _load_index(self, fingerprint):
+        """Lazily build a FAISS index over the entries generated under fingerprint."""
+        if self._index is not None and self._index[0] == fingerprint:
+            return self._index
+
+        import faiss
+
+        self._load_entries()
+
+        # Letters written from another resume, base letter or prompt version are never reused
+        positions = [i for i, entry in enumerate(self._entries) if entry.get('fingerprint') == fingerprint]
+        index = None
+        if positions:
+            index = faiss.IndexFlatIP(self._vectors.shape[1])
+            index.add(self._vectors[positions])
+        self._index = (fingerprint, index, positions)
+        return self._index
+
+    def lookup(self, job, fingerprint):
+        """Return a cover letter adapted to job from a near-duplicate with the same fingerprint, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        try:
+            with self._lock:
+                _, index, positions = self._load_index(fingerprint)
+                if index is None:
+                    return None
+                scores, ids = index.search(self._embed(job.get('description', '')), 1)
+
+            score, idx = float(scores[0][0]), int(ids[0][0])
+            if idx < 0 or score < self.threshold:
+                return None
+
+            entry = self._entries[positions[idx]]
+            if not os.path.exists(entry['path']):
+                return None
+
+            with open(entry['path'], 'r') as f:
+                text = f.read()
+
+            # Swap the cached job's company and title for the new job's
+            for old, new in ((entry['company'], job.get('company')), (entry['title'], job.get('title'))):
+                if old and new:
+                    text = re.sub(re.escape(old), lambda m: new, text)
+
+            logger.info(f"Semantic cache hit ({score:.3f}) for {job.get('title')} at {job.get('company')}")
+            return text
+        except Exception as e:
+            logger.error(f"Error querying semantic cover letter cache: {str(e)}")
+            return None
+
+    def add(self, job, letter_path, fingerprint):
+        """Record the cover letter generated for job under fingerprint; call save() to persist."""
+        if not self.enabled:
+            return
+
+        try:
+            import numpy as np
+
+            key = CoverLetterCache.make_key(fingerprint, job.get('description', ''))
+            with self._lock:
+                self._load_entries()
+
+                # A description already indexed under this fingerprint would only add a duplicate vector
+                if key in self._keys:
+                    return
+
+                vector = self._embed(job.get('description', ''))
+                self._vectors = vector if not len(self._entries) else np.vstack([self._vectors, vector])
+                self._entries.append({
+                    'key': key,
+                    'fingerprint': fingerprint,
+                    'path': letter_path,
+                    'company': job.get('company', ''),
+                    'title': job.get('title', '')
+                })
+                self._keys.add(key)
+                self._dirty = True
+
+                # Rebuild on next lookup
+                self._index = None
+        except Exception as e:
+            logger.error(f"Error updating semantic cover letter cache: {str(e)}")
+
+    def save(self):
+        """Write the vectors and entries added since the last save to disk."""
+        if not self.enabled or not self._dirty:
+            return
+
+        try:
+            import numpy as np
+
+            with self._lock:
+                np.save(self.vectors_path, self._vectors)
+                with open(self.entries_path, 'w') as f:
+                    json.dump(self._entries, f)
+                self._dirty = False
+        except Exception as e:
+            logger.error(f"Error saving semantic cover letter cache: {str(e)}")
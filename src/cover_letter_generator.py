@@ -1,26 +1,123 @@
 import os
+import re
 import json
-import threading
-import queue
+import hashlib
+import asyncio
 import time
+import queue
+import threading
+import itertools
+import orjson
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from loguru import logger
 from datetime import datetime
-from PyPDF2 import PdfReader
-from dotenv import load_dotenv
 from src.llm_provider import LLMProvider
-from src.utils import get_resume_path
+from src.cover_letter_cache import CoverLetterCache
+from src.utils import load_env_once, get_resume_path, extract_text_from_pdf, get_cover_letter_path_for, normalize_pdf_text, PDF_TEXT_CACHE_DIR
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
 
 # Load environment variables from .env file
-load_dotenv()
+load_env_once()
+
+# Bump whenever the prompts below change so cached cover letters are invalidated
+PROMPT_VERSION = "3"
+
+# Generation stops once the model has written the required signature
+SIGNATURE_RE = re.compile(r"Sincerely,\s*Sami Farhat")
+
+# Placeholders the model sometimes leaves in a letter despite the prompt
+_PLACEHOLDER_RE = re.compile(r'\[(Your Name|Position|Company|Job Title|Date)\]')
+
+# Tokens reserved for each generated cover letter
+MAX_LETTER_TOKENS = 2000
+
+# Job descriptions are never cut below this many tokens, even when the context window is short
+MIN_DESCRIPTION_TOKENS = 256
+
+# Model responses kept in memory for identical prompts within one run
+RESPONSE_CACHE_SIZE = 1024
+
+# Separates the prompt prefix shared by every job from the job-specific block
+JOB_DELIMITER = "\n---\n"
+
+SYSTEM_PROMPT = """You are an expert cover letter writer with a specialty in tech industry applications. Your task is to create a highly personalized cover letter for Sami Farhat, a software developer currently working at Boeing.
+
+IMPORTANT GUIDELINES:
+1. ONLY mention experiences that are explicitly mentioned in Sami's resume - do not invent or reference any companies or experiences not in the resume
+2. Focus primarily on Sami's experience at Boeing and his education at Concordia University
+3. The letter must be addressed to the specific company and position in the job details
+4. The letter must be signed "Sincerely, Sami Farhat" at the end
+5. Replace any placeholders like [Position] or [Company] with the actual job details
+6. Highlight specific skills from the resume that match the job requirements
+7. Keep the letter professional, concise (300-400 words), and focused on value Sami can bring
+8. Do not mention "DRW" or any other company not in Sami's resume
+9. Use a natural, first-person writing style as if Sami wrote it himself
+
+STRUCTURE:
+- Opening paragraph: Express interest in the specific position and company
+- Middle paragraphs: Highlight relevant experience at Boeing and skills that match the job requirements
+- Closing paragraph: Express enthusiasm for the opportunity and desire to contribute
+- Signature: "Sincerely, Sami Farhat"
+"""
+
+# Generators shared by from_config, keyed by config content, inputs, worker count and session
+_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
+def _config_digest(config):
+    """Hash the content of a config so equal configs share a generator."""
+    return hashlib.blake2b(orjson.dumps(config, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS), digest_size=16).hexdigest()
 
 class CoverLetterGenerator:
-    def __init__(self, config, max_workers=3):
+    @classmethod
+    def from_config(cls, config, max_workers=3, session=None, resume_text=None, base_text=None):
+        """
+        Return a shared generator for this config, creating it on first use.
+        
+        resume_text and base_text let the caller pass text it already extracted;
+        generators built from different text are cached separately.
+        """
+        key = (_config_digest(config), get_resume_path(), "data/base_cover_letter.pdf", max_workers, session, resume_text, base_text)
+        with _CACHE_LOCK:
+            generator = _CACHE.get(key)
+            if generator is None:
+                generator = cls(config, max_workers=max_workers, session=session, resume_text=resume_text, base_text=base_text)
+                _CACHE[key] = generator
+        return generator
+    
+    def __init__(self, config, max_workers=3, session=None, resume_text=None, base_text=None):
         self.config = config
-        self.llm_provider = LLMProvider(config)
+        self.llm_provider = LLMProvider(config, session=session)
         self.base_cover_letter_path = "data/base_cover_letter.pdf"
         self.resume_path = get_resume_path()
+        self._base_letter_available = os.path.exists(self.base_cover_letter_path)  # Input paths don't change during a run
+        self._resume_available = bool(self.resume_path) and os.path.exists(self.resume_path)
         self.output_directory = "data/cover_letters"
+        self.pdf_text_cache_directory = config.get('cache', {}).get('pdf_text_directory', PDF_TEXT_CACHE_DIR)
         self.max_workers = max_workers  # Maximum number of concurrent threads
+        self._prefix_prompt = None  # User prompt prefix shared by every job
+        self._prefix_tokens = None  # (prefix prompt, token count of system prompt plus prefix)
+        self.context_window = self.llm_provider.num_ctx  # Model context length, capped by llm.context_window
+        self._encoding = None  # tiktoken encoding, loaded on first use; False if it could not be loaded
+        self._truncated_keys = set()  # Cache keys of jobs whose description was cut to fit a prompt
+        self.cache = CoverLetterCache()  # Cover letters keyed by a hash of their prompt inputs
+        self._response_cache = OrderedDict()  # LLM responses keyed by a hash of the full prompt, least recently used first
+        self._response_cache_lock = threading.Lock()
+        
+        # Save cover letters on a background thread so workers go straight back to the LLM
+        self._write_q = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
         
         # Create output directory if it doesn't exist
         os.makedirs(self.output_directory, exist_ok=True)
@@ -29,19 +126,32 @@ class CoverLetterGenerator:
         if not self.llm_provider.is_available():
             logger.warning("LLM provider not available. Cover letter customization will be limited.")
         
-        # Extract resume text once to avoid repeated file I/O
-        self.resume_text = ""
-        if self.resume_path and os.path.exists(self.resume_path):
+        # Extract resume text once to avoid repeated file I/O, unless the caller already did
+        self.resume_text = resume_text or ""
+        if resume_text is None and self._resume_available:
             self.resume_text = self._extract_text_from_pdf(self.resume_path)
             if not self.resume_text:
                 logger.warning("Failed to extract text from resume PDF")
         
-        # Extract base cover letter text once to avoid repeated file I/O
-        self.base_cover_letter_text = ""
-        if os.path.exists(self.base_cover_letter_path):
+        # Extract base cover letter text once to avoid repeated file I/O, unless the caller already did
+        self.base_cover_letter_text = base_text or ""
+        if base_text is None and self._base_letter_available:
             self.base_cover_letter_text = self._extract_text_from_pdf(self.base_cover_letter_path)
             if not self.base_cover_letter_text:
                 logger.warning("Failed to extract text from base cover letter PDF")
+        
+        # Strip extraction noise so every prompt carries fewer tokens
+        self.resume_text = normalize_pdf_text(self.resume_text)
+        self.base_cover_letter_text = normalize_pdf_text(self.base_cover_letter_text)
+        
+        # The resume and base cover letter part of the prompt is the same for every job
+        self._prefix_prompt = self._build_prefix_prompt()
+        self._content_fingerprint = CoverLetterCache.make_fingerprint(self.resume_text, self.base_cover_letter_text, PROMPT_VERSION)
+    
+    @property
+    def content_fingerprint(self):
+        """Fingerprint of the resume, base cover letter and prompt version behind every letter."""
+        return self._content_fingerprint
     
     def generate_cover_letter(self, job):
         """Generate a customized cover letter for a specific job."""
@@ -55,231 +165,550 @@ class CoverLetterGenerator:
                 logger.error("Base cover letter text not available")
                 return None
             
-            # Get job details
+            # Reuse a cover letter generated earlier from identical inputs
+            cached_path = self._get_cached_cover_letter(job)
+            if cached_path:
+                self.flush()
+                return cached_path
+            
+            cover_letter_path = self._generate_single_cover_letter(job)
+            self.flush()
+            if cover_letter_path and self.is_cacheable(job):
+                self._cache_cover_letter(job, cover_letter_path)
+            return cover_letter_path
+            
+        except Exception as e:
+            logger.error(f"Error generating cover letter: {str(e)}")
+            return None
+    
+    def _generate_job(self, job):
+        """Generate the cover letter for one job, returning (job id, path)."""
+        return job['id'], self._generate_single_cover_letter(job)
+    
+    def _generate_single_cover_letter(self, job):
+        """Generate and save the cover letter for one job, returning its path or None."""
+        try:
             job_title = job.get('title', 'Unknown Position')
             company = job.get('company', 'Unknown Company')
-            job_description = job.get('description', '')
-            
-            # Prepare system prompt
-            system_prompt = """You are an expert cover letter writer with a specialty in tech industry applications. Your task is to create a highly personalized cover letter for Sami Farhat, a software developer currently working at Boeing.
-
-IMPORTANT GUIDELINES:
-1. ONLY mention experiences that are explicitly mentioned in Sami's resume - do not invent or reference any companies or experiences not in the resume
-2. Focus primarily on Sami's experience at Boeing and his education at Concordia University
-3. The letter must be addressed to the specific company and position in the job details
-4. The letter must be signed "Sincerely, Sami Farhat" at the end
-5. Replace any placeholders like [Position] or [Company] with the actual job details
-6. Highlight specific skills from the resume that match the job requirements
-7. Keep the letter professional, concise (300-400 words), and focused on value Sami can bring
-8. Do not mention "DRW" or any other company not in Sami's resume
-9. Use a natural, first-person writing style as if Sami wrote it himself
-
-STRUCTURE:
-- Opening paragraph: Express interest in the specific position and company
-- Middle paragraphs: Highlight relevant experience at Boeing and skills that match the job requirements
-- Closing paragraph: Express enthusiasm for the opportunity and desire to contribute
-- Signature: "Sincerely, Sami Farhat"
-"""
+            system_prompt, user_prompt = self._build_prompts(job)
             
-            # Prepare user prompt
-            user_prompt = f"""
-JOB DETAILS:
-Title: {job_title}
-Company: {company}
-Description: {job_description}
-
-APPLICANT'S RESUME:
-{self.resume_text}
-
-BASE COVER LETTER:
-{self.base_cover_letter_text}
-
-Create a personalized cover letter for this job application that focuses on Sami's actual experience at Boeing and his education at Concordia University. The letter should be addressed to {company} for the {job_title} position and signed "Sincerely, Sami Farhat".
-"""
+            # Reuse the response to an identical prompt sent earlier in this run
+            response_key = self._response_key(system_prompt, user_prompt)
+            cached_text = self._get_response(response_key)
+            if cached_text is not None:
+                logger.info(f"Reusing generated response for {job_title} at {company}")
+                return self._save_cover_letter(self._fill_placeholders(cached_text, job), job)
             
-            # Generate cover letter
+            # Generate cover letter, writing each chunk to a temporary file as it arrives
             logger.info(f"Generating cover letter for {job_title} at {company}")
-            cover_letter_text = self.llm_provider.generate_text(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                max_tokens=2000,
-                temperature=0.7
-            )
-            
-            if not cover_letter_text:
-                logger.error("Failed to generate cover letter text")
-                return None
-            
-            # Post-process the cover letter to ensure correct signature
-            if "[Your Name]" in cover_letter_text:
-                cover_letter_text = cover_letter_text.replace("[Your Name]", self.config['user']['name'])
-                logger.info("Fixed signature in cover letter")
+            max_tokens = self._max_tokens(system_prompt, user_prompt, 1)
+            filename = self._cover_letter_filename(job)
+            partial_filename = filename + ".part"
+            parts = []
+            try:
+                # A failed stream raises here, so the letter is never saved or cached
+                with open(partial_filename, 'w') as f:
+                    for chunk in self.llm_provider.generate_text_stream(
+                        system_prompt=system_prompt,
+                        user_prompt=user_prompt,
+                        max_tokens=max_tokens,
+                        temperature=0.7,
+                        stop_pattern=SIGNATURE_RE
+                    ):
+                        f.write(chunk)
+                        parts.append(chunk)
+                
+                streamed_text = "".join(parts)
+                cover_letter_text = streamed_text.strip()
+                if not cover_letter_text:
+                    logger.error(f"Failed to generate cover letter for {job_title} at {company}")
+                    return None
+                self._put_response(response_key, cover_letter_text)
+                
+                # Post-process the cover letter to fill in any leftover placeholders
+                cover_letter_text = self._fill_placeholders(cover_letter_text, job)
+                
+                # Rewrite the file only if post-processing changed the streamed text
+                if cover_letter_text != streamed_text:
+                    with open(partial_filename, 'w') as f:
+                        f.write(cover_letter_text)
+                
+                # Only a complete letter ever appears at the canonical path
+                os.replace(partial_filename, filename)
+            finally:
+                if os.path.exists(partial_filename):
+                    os.remove(partial_filename)
             
-            # Save cover letter to file
-            return self._save_cover_letter(cover_letter_text, job)
+            logger.info(f"Saved customized cover letter to {filename}")
+            return filename
             
         except Exception as e:
             logger.error(f"Error generating cover letter: {str(e)}")
             return None
     
-    def _extract_text_from_pdf(self, pdf_path):
-        """Extract text from a PDF file."""
+    def _response_key(self, system_prompt, user_prompt):
+        """Hash a prompt together with the fingerprint of the prefix it is sent with."""
+        h = hashlib.blake2b(digest_size=16)
+        for part in (self._content_fingerprint, system_prompt, user_prompt):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+    
+    def _get_response(self, key):
+        """Return the cached response for a prompt key, or None."""
+        with self._response_cache_lock:
+            text = self._response_cache.get(key)
+            if text is not None:
+                self._response_cache.move_to_end(key)
+            return text
+    
+    def _put_response(self, key, text):
+        """Cache a response, evicting the least recently used one when full."""
+        with self._response_cache_lock:
+            self._response_cache[key] = text
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+    
+    def _fill_placeholders(self, cover_letter_text, job):
+        """Replace every known placeholder in a generated letter in a single pass."""
+        job_title = job.get('title', 'Unknown Position')
+        subs = {
+            "Your Name": self.config['user']['name'],
+            "Position": job_title,
+            "Job Title": job_title,
+            "Company": job.get('company', 'Unknown Company'),
+            "Date": datetime.now().strftime("%B %d, %Y")
+        }
+        
+        cover_letter_text, count = _PLACEHOLDER_RE.subn(lambda m: subs.get(m.group(1), m.group(0)), cover_letter_text)
+        if count:
+            logger.info(f"Filled {count} placeholders in cover letter")
+        return cover_letter_text
+    
+    def is_cacheable(self, job):
+        """Return whether a letter generated for job may be cached: its whole, non-empty description was in the prompt."""
+        return bool(job.get('description', '').strip()) and self._cache_key(job) not in self._truncated_keys
+    
+    def _cache_key(self, job):
+        """Build the cover letter cache key for a job, hashing only its description per call."""
+        return CoverLetterCache.make_key(self._content_fingerprint, job.get('description', ''))
+    
+    def _get_cached_cover_letter(self, job):
+        """Save a cached cover letter for identical inputs to the job's output path, or return None."""
+        cached_path = self.cache.get(self._cache_key(job))
+        if not cached_path:
+            return None
+        
+        with open(cached_path, 'r') as f:
+            cover_letter = f.read()
+        logger.info(f"Reusing cached cover letter for {job.get('title')} at {job.get('company')}")
+        return self._save_cover_letter(cover_letter, job)
+    
+    def _cache_cover_letter(self, job, cover_letter_path):
+        """Store a generated cover letter in the cache."""
         try:
-            reader = PdfReader(pdf_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
+            with open(cover_letter_path, 'r') as f:
+                self.cache.put(self._cache_key(job), f.read())
         except Exception as e:
-            logger.error(f"Error extracting text from PDF: {str(e)}")
-            return None
+            logger.error(f"Error caching cover letter: {str(e)}")
     
-    def _save_cover_letter(self, cover_letter, job):
-        """Save the cover letter to a file and return the filename."""
+    def _extract_text_from_pdf(self, pdf_path):
+        """Extract text from a PDF file."""
+        return extract_text_from_pdf(pdf_path, self.pdf_text_cache_directory)
+    
+    def _cover_letter_filename(self, job):
+        """Return the output path for a job's cover letter."""
+        if job.get('id'):
+            # Use the canonical per-job path so later runs can reuse this letter
+            return get_cover_letter_path_for(job['id'], self.output_directory)
+        
         # Create a filename based on job details
         company = job.get('company', 'Unknown').replace(' ', '_')
         title = job.get('title', 'Position').replace(' ', '_')
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
-        filename = f"{self.output_directory}/{company}_{title}_{timestamp}.txt"
+        return f"{self.output_directory}/{company}_{title}_{timestamp}.txt"
+    
+    def _save_cover_letter(self, cover_letter, job):
+        """Save the cover letter to a file and return the filename."""
+        filename = self._cover_letter_filename(job)
         
-        # Save the cover letter
-        with open(filename, 'w') as f:
-            f.write(cover_letter)
+        # Hand the write to the writer thread, or write directly once it has been closed
+        if self._writer is not None:
+            self._write_q.put((cover_letter, filename))
+        else:
+            self._write_file(cover_letter, filename)
         
         logger.info(f"Saved customized cover letter to {filename}")
         return filename
     
+    def _write_file(self, cover_letter, filename):
+        """Write cover letter text to filename."""
+        try:
+            with open(filename, 'w') as f:
+                f.write(cover_letter)
+        except Exception as e:
+            logger.error(f"Error saving cover letter to {filename}: {str(e)}")
+    
+    def _writer_loop(self):
+        """Write queued (text, filename) pairs until the None sentinel arrives."""
+        while True:
+            item = self._write_q.get()
+            try:
+                if item is None:
+                    return
+                self._write_file(*item)
+            finally:
+                self._write_q.task_done()
+    
+    def flush(self):
+        """Block until every queued cover letter has been written."""
+        self._write_q.join()
+    
+    def close(self):
+        """Write any queued cover letters and stop the writer thread."""
+        if self._writer is None:
+            return
+        self._write_q.put(None)
+        self._writer.join()
+        self._writer = None
+    
     def generate_cover_letters_batch(self, jobs):
-        """Generate cover letters for multiple jobs in parallel using threads."""
+        """Generate cover letters for multiple jobs concurrently."""
         if not jobs:
             logger.warning("No jobs provided for cover letter generation")
             return {}
         
+        # Reuse cover letters generated earlier from identical inputs
+        results = {}
+        misses = []
+        for job in jobs:
+            cached_path = self._get_cached_cover_letter(job)
+            if cached_path:
+                results[job['id']] = cached_path
+            else:
+                misses.append(job)
+        if results:
+            logger.info(f"Reused {len(results)} cached cover letters")
+        if not misses:
+            self.flush()
+            return results
+        
         if not self.llm_provider.is_available():
             logger.warning("LLM provider not available. Using base cover letter without customization.")
-            results = {}
-            for job in jobs:
+            for job in misses:
                 results[job['id']] = self._use_base_cover_letter(job)
+            self.flush()
             return results
         
         # Check if we have the necessary files
         if not self.base_cover_letter_text:
             logger.error("Base cover letter text not available")
-            return {}
+            self.flush()
+            return results
         
-        # Create a thread pool
-        results = {}
-        job_queue = queue.Queue()
+        # Evaluate the shared prompt prefix once so each job's request reuses it from the KV cache
+        self.llm_provider.warm_up(SYSTEM_PROMPT, self._prefix_prompt)
         
-        # Add jobs to the queue
-        for job in jobs:
-            job_queue.put(job)
+        generated = self._generate_uncached(misses)
         
-        # Create and start worker threads
-        threads = []
-        for _ in range(min(self.max_workers, len(jobs))):
-            thread = threading.Thread(target=self._worker_thread, args=(job_queue, results))
-            thread.daemon = True
-            thread.start()
-            threads.append(thread)
+        # Generated letters must be on disk before they are copied into the cache
+        self.flush()
+        for job in misses:
+            if job['id'] in generated and self.is_cacheable(job):
+                self._cache_cover_letter(job, generated[job['id']])
         
-        # Wait for all threads to complete
-        for thread in threads:
-            thread.join()
+        results.update(generated)
+        return results
+    
+    def _generate_uncached(self, jobs):
+        """Generate cover letters with the LLM for jobs that have no cached letter."""
+        # Write several cover letters per request, then fall back to one request per remaining job
+        results = {}
+        batch_rows = self._fitting_batch_rows(self.config.get('llm', {}).get('batch_rows', 1))
+        if batch_rows > 1 and len(jobs) > 1:
+            results = self._generate_marshaled(jobs, batch_rows)
+            jobs = [job for job in jobs if job['id'] not in results]
+            if not jobs:
+                logger.info(f"Generated {len(results)} cover letters in batches of {batch_rows}")
+                return results
+        
+        if httpx is not None:
+            results.update(asyncio.run(self._generate_batch_async(jobs)))
+            logger.info(f"Generated {len(results)} cover letters with up to {self.max_workers} concurrent requests")
+            return results
+        
+        # Fall back to a thread pool when httpx is not installed
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Workers only return (job id, path); results is written from this thread alone
+            futures = [executor.submit(self._generate_job, job) for job in jobs]
+            for future in as_completed(futures):
+                try:
+                    job_id, cover_letter_path = future.result()
+                except Exception as e:
+                    logger.error(f"Error in worker thread: {str(e)}")
+                    continue
+                if cover_letter_path:
+                    results[job_id] = cover_letter_path
         
         logger.info(f"Generated {len(results)} cover letters using {self.max_workers} threads")
         return results
     
-    def _worker_thread(self, job_queue, results):
-        """Worker thread for processing jobs."""
-        while True:
-            try:
-                # Get a job from the queue
-                job = job_queue.get(block=False)
-                
-                # Get job details
-                job_id = job.get('id', 'unknown')
-                job_title = job.get('title', 'Unknown Position')
-                company = job.get('company', 'Unknown Company')
-                job_description = job.get('description', '')
-                
-                logger.info(f"Thread processing job: {job_title} at {company}")
+    async def _generate_batch_async(self, jobs):
+        """Generate cover letters for all jobs on one event loop sharing a single HTTP client."""
+        semaphore = asyncio.Semaphore(self.max_workers)
+        limits = httpx.Limits(max_connections=self.max_workers)
+        timeout = self.config.get('llm', {}).get('request_timeout', 120)
+        
+        async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+            async def run(job):
+                async with semaphore:
+                    return job['id'], await self.generate_cover_letter_async(job, client)
+            
+            pairs = await asyncio.gather(*(run(job) for job in jobs))
+        
+        return {job_id: path for job_id, path in pairs if path}
+    
+    async def generate_cover_letter_async(self, job, client):
+        """Generate a customized cover letter for a specific job using a shared httpx.AsyncClient."""
+        job_title = job.get('title', 'Unknown Position')
+        company = job.get('company', 'Unknown Company')
+        
+        try:
+            system_prompt, user_prompt = self._build_prompts(job)
+            
+            # Reuse the response to an identical prompt sent earlier in this run
+            response_key = self._response_key(system_prompt, user_prompt)
+            cover_letter_text = self._get_response(response_key)
+            if cover_letter_text is None:
+                # Generate cover letter
+                logger.info(f"Generating cover letter for {job_title} at {company}")
+                cover_letter_text = await self.llm_provider.generate_text_async(
+                    client,
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    max_tokens=self._max_tokens(system_prompt, user_prompt, 1),
+                    temperature=0.7,
+                    stop_pattern=SIGNATURE_RE
+                )
                 
-                # Prepare system prompt
-                system_prompt = """You are an expert cover letter writer with a specialty in tech industry applications. Your task is to create a highly personalized cover letter for Sami Farhat, a software developer currently working at Boeing.
-
-IMPORTANT GUIDELINES:
-1. ONLY mention experiences that are explicitly mentioned in Sami's resume - do not invent or reference any companies or experiences not in the resume
-2. Focus primarily on Sami's experience at Boeing and his education at Concordia University
-3. The letter must be addressed to the specific company and position in the job details
-4. The letter must be signed "Sincerely, Sami Farhat" at the end
-5. Replace any placeholders like [Position] or [Company] with the actual job details
-6. Highlight specific skills from the resume that match the job requirements
-7. Keep the letter professional, concise (300-400 words), and focused on value Sami can bring
-8. Do not mention "DRW" or any other company not in Sami's resume
-9. Use a natural, first-person writing style as if Sami wrote it himself
+                if not cover_letter_text:
+                    logger.error(f"Failed to generate cover letter for {job_title} at {company}")
+                    return None
+                self._put_response(response_key, cover_letter_text)
+            else:
+                logger.info(f"Reusing generated response for {job_title} at {company}")
+            
+            # Post-process the cover letter to fill in any leftover placeholders
+            cover_letter_text = self._fill_placeholders(cover_letter_text, job)
+            
+            # Save cover letter to file
+            return self._save_cover_letter(cover_letter_text, job)
+            
+        except Exception as e:
+            logger.error(f"Error generating cover letter: {str(e)}")
+            return None
+    
+    def _generate_marshaled(self, jobs, batch_rows):
+        """Generate cover letters for batch_rows jobs per LLM call, returning those that succeeded."""
+        job_iter = iter(jobs)
+        chunks = list(iter(lambda: list(itertools.islice(job_iter, batch_rows)), []))
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for chunk_results in executor.map(self._generate_marshaled_chunk, chunks):
+                results.update(chunk_results)
+        return results
+    
+    def _generate_marshaled_chunk(self, jobs_chunk):
+        """Generate the cover letters for one chunk of jobs with a single LLM call."""
+        try:
+            logger.info(f"Generating {len(jobs_chunk)} cover letters in one request")
+            system_prompt, user_prompt = self._attach_prefix(self._build_marshaled_prompt(jobs_chunk))
+            
+            response_text = self.llm_provider.generate_text(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                max_tokens=self._max_tokens(system_prompt, user_prompt, len(jobs_chunk)),
+                temperature=0.7
+            )
+            if not response_text:
+                return {}
+            
+            # Tolerate any text the model writes around the JSON object
+            letters = json.loads(response_text[response_text.find('{'):response_text.rfind('}') + 1])['letters']
+        except Exception as e:
+            logger.warning(f"Could not parse batched cover letters, falling back to one request per job: {str(e)}")
+            return {}
+        
+        jobs_by_id = {str(job['id']): job for job in jobs_chunk}
+        results = {}
+        for entry in letters:
+            job = jobs_by_id.get(str(entry.get('job_id')))
+            cover_letter_text = entry.get('letter')
+            if not job or not cover_letter_text:
+                continue
+            
+            # Post-process the cover letter to fill in any leftover placeholders
+            cover_letter_text = self._fill_placeholders(cover_letter_text, job)
+            
+            results[job['id']] = self._save_cover_letter(cover_letter_text, job)
+        return results
+    
+    def _fitting_batch_rows(self, batch_rows):
+        """Return the most letters, up to batch_rows, whose prompt and responses fit the context window together."""
+        for rows in range(batch_rows, 1, -1):
+            if self._description_budget(rows) >= rows * MIN_DESCRIPTION_TOKENS:
+                if rows < batch_rows:
+                    logger.info(f"Writing {rows} cover letters per request instead of {batch_rows} to fit the context window")
+                return rows
+        
+        if batch_rows > 1:
+            logger.info("Context window too small to batch cover letters, writing one per request")
+        return 1
+    
+    def _build_marshaled_prompt(self, jobs_chunk):
+        """Build the job-specific part of the user prompt for several jobs at once."""
+        # Split the room left in the context window evenly between the jobs
+        budget = self._description_budget(len(jobs_chunk)) // len(jobs_chunk)
+        job_blocks = []
+        for i, job in enumerate(jobs_chunk, 1):
+            job_blocks.append(f"""JOB {i}:
+Job ID: {job['id']}
+Title: {job.get('title', 'Unknown Position')}
+Company: {job.get('company', 'Unknown Company')}
+Description: {self._fit_job_description(job, budget)}
+""")
+        
+        return "\n".join(job_blocks) + f"""
+Create a separate personalized cover letter for each of the {len(jobs_chunk)} jobs above that focuses on Sami's actual experience at Boeing and his education at Concordia University. Each letter should be addressed to that job's company for that job's position and signed "Sincerely, Sami Farhat".
 
-STRUCTURE:
-- Opening paragraph: Express interest in the specific position and company
-- Middle paragraphs: Highlight relevant experience at Boeing and skills that match the job requirements
-- Closing paragraph: Express enthusiasm for the opportunity and desire to contribute
-- Signature: "Sincerely, Sami Farhat"
+Respond with only a JSON object of the form {{"letters": [{{"job_id": "<Job ID>", "letter": "<cover letter>"}}]}} containing one entry per job.
 """
-                
-                # Prepare user prompt
-                user_prompt = f"""
-JOB DETAILS:
-Title: {job_title}
-Company: {company}
-Description: {job_description}
-
+    
+    def _build_prompts(self, job):
+        """Build the system prompt and user prompt for a job."""
+        return self._attach_prefix(self._build_job_prompt(job))
+    
+    def _attach_prefix(self, job_prompt):
+        """
+        Combine a job-specific prompt block with the shared prefix.
+        
+        The resume and base cover letter form a prefix shared by every job, with
+        the job-specific block strictly at the end, so Ollama can reuse the
+        evaluated prefix from its KV cache and only process the job block.
+        """
+        return SYSTEM_PROMPT, self._prefix_prompt + JOB_DELIMITER + job_prompt
+    
+    def _build_prefix_prompt(self):
+        """Build the part of the user prompt shared by every job."""
+        return f"""
 APPLICANT'S RESUME:
 {self.resume_text}
 
 BASE COVER LETTER:
 {self.base_cover_letter_text}
+"""
+    
+    def _build_job_prompt(self, job):
+        """Build the job-specific part of the user prompt."""
+        job_title = job.get('title', 'Unknown Position')
+        company = job.get('company', 'Unknown Company')
+        job_description = self._fit_job_description(job, self._description_budget(1))
+        
+        return f"""
+JOB DETAILS:
+Title: {job_title}
+Company: {company}
+Description: {job_description}
 
 Create a personalized cover letter for this job application that focuses on Sami's actual experience at Boeing and his education at Concordia University. The letter should be addressed to {company} for the {job_title} position and signed "Sincerely, Sami Farhat".
 """
-                
-                # Generate cover letter
-                cover_letter_text = self.llm_provider.generate_text(
-                    system_prompt=system_prompt,
-                    user_prompt=user_prompt,
-                    max_tokens=2000,
-                    temperature=0.7
-                )
-                
-                if cover_letter_text:
-                    # Post-process the cover letter to ensure correct signature
-                    if "[Your Name]" in cover_letter_text:
-                        cover_letter_text = cover_letter_text.replace("[Your Name]", self.config['user']['name'])
-                        logger.info("Fixed signature in cover letter")
-                    
-                    # Save cover letter to file
-                    cover_letter_path = self._save_cover_letter(cover_letter_text, job)
-                    if cover_letter_path:
-                        # Store the result
-                        results[job['id']] = cover_letter_path
-                else:
-                    logger.error(f"Failed to generate cover letter for {job_title} at {company}")
-            except queue.Empty:
-                break
-            except Exception as e:
-                logger.error(f"Error in worker thread: {str(e)}")
+    
+    def _get_encoding(self):
+        """Return the tiktoken encoding for budgeting, or None when tiktoken is unavailable."""
+        if tiktoken is None:
+            return None
+        
+        if self._encoding is None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(self.llm_provider.ollama_model)
+            except KeyError:
+                # Local models have no tiktoken encoding of their own; cl100k_base is close enough for budgeting
+                try:
+                    self._encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    # The encoding is downloaded on first use, which fails offline
+                    logger.warning(f"Could not load tiktoken encoding, estimating token counts: {str(e)}")
+                    self._encoding = False
+        return self._encoding or None
+    
+    def _count_tokens(self, text):
+        """Count the tokens in text, estimating 4 characters per token without a tiktoken encoding."""
+        encoding = self._get_encoding()
+        if encoding is None:
+            return len(text) // 4
+        return len(encoding.encode(text))
+    
+    def _description_budget(self, letters):
+        """Return the tokens left for job descriptions in a request generating the given number of letters."""
+        if self._prefix_tokens is None or self._prefix_tokens[0] is not self._prefix_prompt:
+            self._prefix_tokens = (self._prefix_prompt, self._count_tokens(SYSTEM_PROMPT + self._prefix_prompt))
+        
+        # Leave room for the instructions around each description
+        return self.context_window - self._prefix_tokens[1] - letters * (MAX_LETTER_TOKENS + 200)
+    
+    def _max_tokens(self, system_prompt, user_prompt, letters):
+        """Return the tokens a request may generate: the letters' allowance, capped to the context left after the prompt."""
+        remaining = self.context_window - self._count_tokens(system_prompt + user_prompt)
+        if remaining < MAX_LETTER_TOKENS * letters:
+            logger.warning(f"Only {max(remaining, 0)} tokens of the context window are left for the response")
+        return max(1, min(MAX_LETTER_TOKENS * letters, remaining))
+    
+    def _fit_job_description(self, job, budget):
+        """Fit a job's description to budget tokens, remembering the job if it had to be cut."""
+        description, truncated = self._fit_description(job.get('description', ''), budget)
+        if truncated:
+            # A letter written from part of the description must not be reused for the whole one
+            self._truncated_keys.add(self._cache_key(job))
+        return description
+    
+    def _fit_description(self, description, budget):
+        """
+        Truncate a job description to budget tokens, keeping its head and tail.
+        
+        The description always keeps at least MIN_DESCRIPTION_TOKENS, so a short
+        context window shortens it but never blanks it.
+        
+        Returns:
+            tuple: (description, whether it was truncated)
+        """
+        budget = max(budget, MIN_DESCRIPTION_TOKENS)
+        if self._count_tokens(description) <= budget:
+            return description, False
+        
+        logger.info(f"Truncating job description to {budget} tokens to fit the context window")
+        encoding = self._get_encoding()
+        if encoding is None:
+            chars = budget * 4
+            return description[:chars // 2] + "\n...\n" + description[-(chars - chars // 2):], True
+        
+        tokens = encoding.encode(description)
+        head = budget // 2
+        return encoding.decode(tokens[:head]) + "\n...\n" + encoding.decode(tokens[-(budget - head):]), True
     
     def _use_base_cover_letter(self, job):
         """Use the base cover letter without customization."""
-        if not os.path.exists(self.base_cover_letter_path):
+        if not self._base_letter_available:
             logger.error(f"Base cover letter not found at {self.base_cover_letter_path}")
             return None
         
         try:
-            # Extract text from PDF
-            base_cover_letter_text = self._extract_text_from_pdf(self.base_cover_letter_path)
+            # Reuse the text extracted at construction time
+            base_cover_letter_text = self.base_cover_letter_text
             if not base_cover_letter_text:
-                logger.error("Failed to extract text from base cover letter PDF")
+                logger.error("Base cover letter text not available")
                 return None
             
             # Create a copy of the base cover letter
@@ -1,24 +1,31 @@
 import os
 import json
-import threading
-import queue
+import asyncio
 import time
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from loguru import logger
 from datetime import datetime
-from PyPDF2 import PdfReader
-from dotenv import load_dotenv
 from src.llm_provider import LLMProvider
+from src.utils import load_env_once, get_cover_letter_path_for, extract_text_from_pdf, normalize_pdf_text, PDF_TEXT_CACHE_DIR
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
 # Load environment variables from .env file
-load_dotenv()
+load_env_once()
+
+SYSTEM_PROMPT = "You are a professional cover letter writer. Your task is to customize a cover letter for a specific job application."
 
 class CoverLetterGenerator:
     def __init__(self, config, max_workers=3):
         self.config = config
         self.llm_provider = LLMProvider(config)
         self.base_cover_letter_path = "data/base_cover_letter.pdf"
+        self._base_letter_available = os.path.exists(self.base_cover_letter_path)  # Input paths don't change during a run
         self.output_directory = "data/cover_letters"
+        self.pdf_text_cache_directory = config.get('cache', {}).get('pdf_text_directory', PDF_TEXT_CACHE_DIR)
         self.max_workers = max_workers  # Maximum number of concurrent threads
         
         # Create output directory if it doesn't exist
@@ -27,6 +34,13 @@ class CoverLetterGenerator:
         # Check if LLM provider is available
         if not self.llm_provider.is_available():
             logger.warning("LLM provider not available. Cover letter customization will be limited.")
+        
+        # Extract base cover letter text once to avoid repeated file I/O
+        self.base_cover_letter_text = ""
+        if self._base_letter_available:
+            self.base_cover_letter_text = normalize_pdf_text(self._extract_text_from_pdf(self.base_cover_letter_path))
+            if not self.base_cover_letter_text:
+                logger.warning("Failed to extract text from base cover letter PDF")
     
     def generate_cover_letters_batch(self, jobs):
         """Generate cover letters for multiple jobs in parallel using threads."""
@@ -41,63 +55,76 @@ class CoverLetterGenerator:
                 results[job['id']] = self._use_base_cover_letter(job)
             return results
         
-        # Extract base cover letter text once to avoid repeated file I/O
-        base_cover_letter = self._extract_text_from_pdf(self.base_cover_letter_path)
+        base_cover_letter = self.base_cover_letter_text
         if not base_cover_letter:
-            logger.error("Failed to extract text from base cover letter PDF")
+            logger.error("Base cover letter text not available")
             return {}
         
-        # Create a thread pool
-        results = {}
-        job_queue = queue.Queue()
-        
-        # Add jobs to the queue
-        for job in jobs:
-            job_queue.put(job)
-        
-        # Create and start worker threads
-        threads = []
-        for _ in range(min(self.max_workers, len(jobs))):
-            thread = threading.Thread(
-                target=self._worker_thread, 
-                args=(job_queue, results, base_cover_letter)
-            )
-            thread.daemon = True
-            thread.start()
-            threads.append(thread)
+        if httpx is not None:
+            results = asyncio.run(self._generate_batch_async(jobs, base_cover_letter))
+            logger.info(f"Generated {len(results)} cover letters with up to {self.max_workers} concurrent requests")
+            return results
         
-        # Wait for all threads to complete
-        for thread in threads:
-            thread.join()
+        # Fall back to a thread pool when httpx is not installed
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Workers only return (job id, path); results is written from this thread alone
+            futures = [executor.submit(self._generate_job, job, base_cover_letter) for job in jobs]
+            for future in as_completed(futures):
+                try:
+                    job_id, cover_letter_path = future.result()
+                except Exception as e:
+                    logger.error(f"Error in worker thread: {str(e)}")
+                    continue
+                if cover_letter_path:
+                    results[job_id] = cover_letter_path
         
         logger.info(f"Generated {len(results)} cover letters using {self.max_workers} threads")
         return results
     
-    def _worker_thread(self, job_queue, results, base_cover_letter):
-        """Worker thread to process jobs from the queue."""
-        while not job_queue.empty():
+    async def _generate_batch_async(self, jobs, base_cover_letter):
+        """Generate cover letters for all jobs on one event loop sharing a single HTTP client."""
+        semaphore = asyncio.Semaphore(self.max_workers)
+        limits = httpx.Limits(max_connections=self.max_workers)
+        timeout = self.config.get('llm', {}).get('request_timeout', 120)
+        
+        async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+            pairs = await asyncio.gather(*(self._generate_one(job, semaphore, client, base_cover_letter) for job in jobs))
+        
+        return {job_id: path for job_id, path in pairs if path}
+    
+    async def _generate_one(self, job, semaphore, client, base_cover_letter):
+        """Generate a cover letter for a single job, returning (job id, path)."""
+        async with semaphore:
+            job_title = job.get('title', 'Unknown Position')
+            company = job.get('company', 'the Company')
+            logger.info(f"Generating cover letter for {job_title} at {company}")
+            
             try:
-                job = job_queue.get(block=False)
-                logger.info(f"Generating cover letter for {job['title']} at {job['company']}")
+                # Prepare prompts for the LLM
+                user_prompt = self._create_prompt(base_cover_letter, job_title, company, job.get('description', ''))
                 
-                # Generate cover letter
-                cover_letter_path = self._generate_single_cover_letter(job, base_cover_letter)
+                customized_cover_letter = await self.llm_provider.generate_text_async(
+                    client,
+                    system_prompt=SYSTEM_PROMPT,
+                    user_prompt=user_prompt,
+                    max_tokens=1500,
+                    temperature=0.7
+                )
                 
-                # Store result
-                if cover_letter_path:
-                    results[job['id']] = cover_letter_path
+                if not customized_cover_letter:
+                    logger.error(f"Failed to generate customized cover letter for {job_title} at {company}")
+                    return job['id'], self._use_base_cover_letter(job)
                 
-                # Mark task as done
-                job_queue.task_done()
+                return job['id'], self._save_cover_letter(customized_cover_letter, job)
                 
-            except queue.Empty:
-                break
             except Exception as e:
-                logger.error(f"Error in worker thread: {str(e)}")
-                try:
-                    job_queue.task_done()
-                except:
-                    pass
+                logger.error(f"Error generating cover letter: {str(e)}")
+                return job['id'], self._use_base_cover_letter(job)
+    
+    def _generate_job(self, job, base_cover_letter):
+        """Generate the cover letter for one job, returning (job id, path)."""
+        return job['id'], self._generate_single_cover_letter(job, base_cover_letter)
     
     def _generate_single_cover_letter(self, job, base_cover_letter):
         """Generate a cover letter for a single job."""
@@ -106,14 +133,14 @@ class CoverLetterGenerator:
             job_title = job.get('title', 'Unknown Position')
             company = job.get('company', 'the Company')
             job_description = job.get('description', '')
+            logger.info(f"Generating cover letter for {job_title} at {company}")
             
             # Prepare prompts for the LLM
-            system_prompt = "You are a professional cover letter writer. Your task is to customize a cover letter for a specific job application."
             user_prompt = self._create_prompt(base_cover_letter, job_title, company, job_description)
             
             # Generate customized cover letter using LLM provider
             customized_cover_letter = self.llm_provider.generate_text(
-                system_prompt=system_prompt,
+                system_prompt=SYSTEM_PROMPT,
                 user_prompt=user_prompt,
                 max_tokens=1500,
                 temperature=0.7
@@ -139,16 +166,12 @@ class CoverLetterGenerator:
             return self._use_base_cover_letter(job)
         
         try:
-            # Load base cover letter from PDF
-            if not os.path.exists(self.base_cover_letter_path):
-                logger.error(f"Base cover letter not found at {self.base_cover_letter_path}")
-                return None
-            base_cover_letter = self._extract_text_from_pdf(self.base_cover_letter_path)
-            if not base_cover_letter:
-                logger.error("Failed to extract text from base cover letter PDF")
+            # Check if we have the necessary files
+            if not self.base_cover_letter_text:
+                logger.error("Base cover letter text not available")
                 return None
             
-            return self._generate_single_cover_letter(job, base_cover_letter)
+            return self._generate_single_cover_letter(job, self.base_cover_letter_text)
             
         except Exception as e:
             logger.error(f"Error generating cover letter: {str(e)}")
@@ -173,25 +196,20 @@ class CoverLetterGenerator:
     
     def _extract_text_from_pdf(self, pdf_path):
         """Extract text from a PDF file."""
-        try:
-            with open(pdf_path, 'rb') as file:
-                reader = PdfReader(file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text()
-                return text
-        except Exception as e:
-            logger.error(f"Error extracting text from PDF: {str(e)}")
-            return None
+        return extract_text_from_pdf(pdf_path, self.pdf_text_cache_directory)
     
     def _save_cover_letter(self, cover_letter_text, job):
         """Save the cover letter to a file."""
         try:
-            company = job.get('company', 'Unknown').replace(' ', '_')
-            title = job.get('title', 'Position').replace(' ', '_')
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            
-            filename = f"{self.output_directory}/{company}_{title}_{timestamp}.txt"
+            if job.get('id'):
+                # Use the canonical per-job path so later runs can reuse this letter
+                filename = get_cover_letter_path_for(job['id'], self.output_directory)
+            else:
+                company = job.get('company', 'Unknown').replace(' ', '_')
+                title = job.get('title', 'Position').replace(' ', '_')
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                
+                filename = f"{self.output_directory}/{company}_{title}_{timestamp}.txt"
             
             with open(filename, 'w') as f:
                 f.write(cover_letter_text)
@@ -205,15 +223,15 @@ class CoverLetterGenerator:
     
     def _use_base_cover_letter(self, job):
         """Use the base cover letter without customization."""
-        if not os.path.exists(self.base_cover_letter_path):
+        if not self._base_letter_available:
             logger.error(f"Base cover letter not found at {self.base_cover_letter_path}")
             return None
         
         try:
-            # Extract text from PDF
-            base_cover_letter_text = self._extract_text_from_pdf(self.base_cover_letter_path)
+            # Reuse the text extracted at construction time
+            base_cover_letter_text = self.base_cover_letter_text
             if not base_cover_letter_text:
-                logger.error("Failed to extract text from base cover letter PDF")
+                logger.error("Base cover letter text not available")
                 return None
             
             # Create a copy of the base cover letter
@@ -1,21 +1,85 @@
 import requests
 from bs4 import BeautifulSoup
-import time
-import random
 from loguru import logger
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+import asyncio
+import re
 import json
+import orjson
 import os
+from urllib.parse import urlsplit
+
+# LinkedIn's guest job search, returning a page of HTML job cards from the start offset
+GUEST_SEARCH_URL = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
+
+# Numeric job id in a LinkedIn job URL, which guest search results prefix with a title slug
+JOB_ID_RE = re.compile(r"/jobs/view/(?:[^/?]*-)?(\d+)")
+
+# Requests the extractor never needs, aborted to cut page weight
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+BLOCKED_HOSTS = ("doubleclick.net", "google-analytics.com", "px.ads.linkedin.com")
+
+# Counts the job links on a search results page
+JS_COUNT_JOB_LINKS = """() => document.querySelectorAll('a[href*="/jobs/view/"]').length"""
+
+# Resolves with the new job link count once more links than prev have loaded
+JS_MORE_JOB_LINKS = """(prev) => {
+    const count = document.querySelectorAll('a[href*="/jobs/view/"]').length;
+    return count > prev ? count : 0;
+}"""
+
+# Job page elements read by the extractor
+TITLE_SELECTOR = ".job-details-jobs-unified-top-card__job-title"
+COMPANY_SELECTOR = ".job-details-jobs-unified-top-card__company-name"
+LOCATION_SELECTOR = ".job-details-jobs-unified-top-card__bullet"
+
+# Reads the job description; innerText keeps the line breaks
+JS_DESC = "() => document.querySelector('.jobs-description__content')?.innerText || ''"
+
+# Description cleanup applied to the extracted innerText
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+_LINE_SPACE_RE = re.compile(r'[ \t]*\n[ \t]*')
+
+def _clean_description(description):
+    """Strip spaces around every line and collapse runs of blank lines in one regex pass each."""
+    description = _LINE_SPACE_RE.sub('\n', description)
+    return _BLANK_LINES_RE.sub('\n\n', description).strip()
+
+async def _block_unneeded_requests(route):
+    """Abort images, fonts, media and tracker requests; let everything else through."""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or (urlsplit(request.url).hostname or "").endswith(BLOCKED_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def _read_text(page, selector, default=''):
+    """Return the inner text of the first element matching selector, or default if there is none."""
+    try:
+        # Skip missing fields at once instead of waiting for them to appear
+        locator = page.locator(selector).first
+        if not await locator.count():
+            return default
+        return (await locator.inner_text(timeout=2000)).strip() or default
+    except Exception:
+        return default
 
 class JobDiscovery:
-    def __init__(self, config):
+    def __init__(self, config, session=None):
         self.config = config
+        self.session = session or requests.Session()
         self.job_listings = []
+        self._seen_ids = set()  # LinkedIn job ids already queued or visited
+        self.debug = config.get('debug', False)  # Screenshots and pauses between locations
+        
+        # Match every exclude keyword in one pass; the fallback pattern never matches
+        exclude_keywords = self.config['job_search'].get('exclude_keywords', [])
+        self._exclude_re = re.compile("|".join(re.escape(keyword) for keyword in exclude_keywords) or r"(?!x)x", re.IGNORECASE)
         
     def find_jobs(self):
         """Find job listings based on search criteria."""
         logger.info("Searching jobs on linkedin...")
-        self._search_linkedin()
+        asyncio.run(self._search_linkedin())
         
         # Filter jobs based on criteria
         filtered_jobs = self.filter_jobs()
@@ -23,204 +87,111 @@ class JobDiscovery:
         
         return filtered_jobs
         
-    def _search_linkedin(self):
-        """Search jobs on LinkedIn with direct URL visits."""
-        job_count = 0
+    async def _search_linkedin(self):
+        """Search jobs on LinkedIn, visiting job pages concurrently from several pages."""
+        max_jobs = 10
+        detail_pages = self.config['browser'].get('detail_pages', 4)
+        profile_directory = self.config['browser'].get('profile_directory', "data/.pw_profile")
         
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=self.config['browser']['headless']
-            )
-            context = browser.new_context(
+        async with async_playwright() as p:
+            # A persistent profile keeps the LinkedIn session cookies between runs
+            context = await p.chromium.launch_persistent_context(
+                profile_directory,
+                headless=self.config['browser']['headless'],
                 user_agent=self.config['browser']['user_agent'],
                 viewport={'width': self.config['browser']['viewport_width'], 
                           'height': self.config['browser']['viewport_height']}
             )
-            page = context.new_page()
+            await context.route("**/*", _block_unneeded_requests)
+            page = context.pages[0] if context.pages else await context.new_page()
             
             try:
                 # Log in to LinkedIn
                 logger.info("Logging in to LinkedIn...")
-                page.goto("https://www.linkedin.com/login")
-                page.wait_for_load_state("domcontentloaded", timeout=10000)
+                await page.goto("https://www.linkedin.com/login")
+                await page.wait_for_load_state("domcontentloaded", timeout=10000)
                 
                 # Check if already logged in
                 if "feed" in page.url or "checkpoint" in page.url or "dashboard" in page.url:
                     logger.info("Already logged in to LinkedIn")
                 else:
                     # Fill login form
-                    page.fill("#username", self.config['job_boards']['linkedin']['username'])
-                    page.fill("#password", self.config['job_boards']['linkedin']['password'])
+                    await page.fill("#username", self.config['job_boards']['linkedin']['username'])
+                    await page.fill("#password", self.config['job_boards']['linkedin']['password'])
                     
                     # Submit login form
-                    with page.expect_navigation(timeout=10000):
-                        page.click("button[type='submit']")
+                    async with page.expect_navigation(timeout=10000):
+                        await page.click("button[type='submit']")
                     
-                    page.wait_for_load_state("domcontentloaded", timeout=10000)
+                    await page.wait_for_load_state("domcontentloaded", timeout=10000)
                 
                 # Save screenshot for debugging
-                os.makedirs("logs", exist_ok=True)
-                page.screenshot(path="logs/linkedin_after_login.png")
+                if self.debug:
+                    os.makedirs("logs", exist_ok=True)
+                    await page.screenshot(path="logs/linkedin_after_login.jpg", type="jpeg", quality=60)
                 
                 # Search for jobs with all keywords at once
                 all_keywords = " OR ".join(self.config['job_search']['keywords'])
                 
-                # Process each location
+                # Collect the job pages to visit for every location first
+                job_targets = []
                 for location in self.config['job_search']['locations']:
-                    if job_count >= 10:
+                    if len(job_targets) >= max_jobs:
                         break
                         
-                    # Format search URL
-                    search_url = f"https://www.linkedin.com/jobs/search/?keywords={all_keywords.replace(' ', '%20')}&location={location.replace(' ', '%20')}&f_TPR=r86400"
                     logger.info(f"Searching jobs in {location}")
                     
-                    # Navigate to search URL
-                    page.goto(search_url)
-                    page.wait_for_load_state("domcontentloaded", timeout=10000)
-                    
-                    # Save screenshot for debugging
-                    page.screenshot(path=f"logs/linkedin_search_{location}.png")
-                    
-                    # Scroll to load more jobs
-                    logger.info("Loading more jobs...")
-                    for _ in range(3):
-                        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                        page.wait_for_timeout(1000)
-                    
-                    # Extract job URLs only
-                    job_urls = page.evaluate("""() => {
-                        const links = Array.from(document.querySelectorAll('a[href*="/jobs/view/"]'));
-                        return links.slice(0, 5).map(link => link.href);
-                    }""")
+                    # List only as many jobs as are still needed, through the guest API unless it is blocked
+                    remaining = max_jobs - len(job_targets)
+                    job_urls = await asyncio.to_thread(self._search_linkedin_guest, all_keywords, location, remaining)
+                    if job_urls is None:
+                        job_urls = await self._search_linkedin_page(page, all_keywords, location, remaining)
                     
                     logger.info(f"Found {len(job_urls)} job URLs")
                     
-                    # Visit each job URL to get details
+                    # The same job is often linked more than once on a page
+                    job_urls = list(dict.fromkeys(job_urls))
+                    
                     for url in job_urls:
-                        if job_count >= 10:
+                        if len(job_targets) >= max_jobs:
                             break
                         
-                        # Clean the URL to remove tracking parameters
-                        base_url = url.split('?')[0]
-                        job_id = base_url.split('/view/')[1].replace('/', '')
-                        
-                        clean_url = f"https://www.linkedin.com/jobs/view/{job_id}/"
-                        logger.info(f"Visiting job URL: {clean_url}")
-                        
-                        # Navigate to job page
-                        page.goto(clean_url)
-                        page.wait_for_load_state("domcontentloaded", timeout=10000)
-                        
-                        # Extract job details directly from the job page
-                        job_details = page.evaluate("""() => {
-                            // Get job title
-                            const titleElement = document.querySelector('.job-details-jobs-unified-top-card__job-title');
-                            const title = titleElement ? titleElement.textContent.trim() : '';
-                            
-                            // Get company name
-                            const companyElement = document.querySelector('.job-details-jobs-unified-top-card__company-name');
-                            const company = companyElement ? companyElement.textContent.trim() : '';
-                            
-                            // Get location
-                            const locationElement = document.querySelector('.job-details-jobs-unified-top-card__bullet');
-                            const location = locationElement ? locationElement.textContent.trim() : '';
-                            
-                            // Get job description with better formatting
-                            const descriptionElement = document.querySelector('.jobs-description__content');
-                            let description = '';
-                            
-                            if (descriptionElement) {
-                                // Process the description to maintain formatting
-                                const processNode = (node, level = 0) => {
-                                    let text = '';
-                                    
-                                    // Process each child node
-                                    for (const child of node.childNodes) {
-                                        if (child.nodeType === Node.TEXT_NODE) {
-                                            // Text node - add its content
-                                            const content = child.textContent.trim();
-                                            if (content) {
-                                                text += content + ' ';
-                                            }
-                                        } else if (child.nodeType === Node.ELEMENT_NODE) {
-                                            // Element node - process based on tag
-                                            const tagName = child.tagName.toLowerCase();
-                                            
-                                            if (tagName === 'br') {
-                                                // Line break
-                                                text += '\\n';
-                                            } else if (tagName === 'p') {
-                                                // Paragraph - add with newlines
-                                                const paraText = processNode(child, level + 1);
-                                                if (paraText.trim()) {
-                                                    text += '\\n\\n' + paraText + '\\n';
-                                                }
-                                            } else if (tagName === 'ul' || tagName === 'ol') {
-                                                // List - process each item
-                                                text += '\\n';
-                                                let i = 1;
-                                                for (const li of child.querySelectorAll('li')) {
-                                                    const itemText = processNode(li, level + 1).trim();
-                                                    if (itemText) {
-                                                        text += `\\n${tagName === 'ol' ? i++ + '.' : '•'} ${itemText}`;
-                                                    }
-                                                }
-                                                text += '\\n';
-                                            } else if (tagName === 'h1' || tagName === 'h2' || tagName === 'h3' || tagName === 'h4') {
-                                                // Heading - add with emphasis
-                                                const headingText = processNode(child, level + 1).trim();
-                                                if (headingText) {
-                                                    text += `\\n\\n${headingText}\\n`;
-                                                }
-                                            } else if (tagName === 'strong' || tagName === 'b') {
-                                                // Bold text
-                                                const boldText = processNode(child, level + 1).trim();
-                                                if (boldText) {
-                                                    text += boldText + ' ';
-                                                }
-                                            } else {
-                                                // Other elements - process recursively
-                                                text += processNode(child, level + 1);
-                                            }
-                                        }
-                                    }
-                                    
-                                    return text;
-                                };
-                                
-                                description = processNode(descriptionElement).trim();
-                                
-                                // Clean up multiple newlines and spaces
-                                description = description.replace(/\\n\\s*\\n\\s*\\n/g, '\\n\\n');
-                                description = description.replace(/\\s+/g, ' ').replace(/\\s*\\n\\s*/g, '\\n');
-                            }
-                            
-                            return {
-                                title: title || 'Unknown Title',
-                                company: company || 'Unknown Company',
-                                location: location || '',
-                                description: description || ''
-                            };
-                        }""")
+                        # Take the job id from the URL, dropping tracking parameters
+                        match = JOB_ID_RE.search(url)
+                        if not match:
+                            continue
+                        job_id = match.group(1)
                         
-                        # Create job object
-                        job = {
-                            'title': job_details.get('title', 'Unknown Title'),
-                            'company': job_details.get('company', 'Unknown Company'),
-                            'location': job_details.get('location', location),
-                            'url': clean_url,
-                            'source': 'linkedin',
-                            'id': job_id,
-                            'description': job_details.get('description', '').replace('\\n', '\n')
-                        }
+                        # Skip jobs already found in another location
+                        if job_id in self._seen_ids:
+                            continue
+                        self._seen_ids.add(job_id)
                         
+                        clean_url = f"https://www.linkedin.com/jobs/view/{job_id}/"
+                        job_targets.append((job_id, clean_url, location))
+                    
+                    # Short delay between locations
+                    if self.debug:
+                        await asyncio.sleep(2)
+                
+                # Pages in the same context share the login
+                pages = asyncio.Queue()
+                for _ in range(min(detail_pages, len(job_targets))):
+                    pages.put_nowait(await context.new_page())
+                
+                # Visit the job pages concurrently, at most one per detail page at a time
+                jobs = await asyncio.gather(*(self._fetch_linkedin_job(pages, *target) for target in job_targets))
+                
+                job_count = 0
+                for (job_id, _, _), job in zip(job_targets, jobs):
+                    if job:
                         # Add job to list
                         self.job_listings.append(job)
                         job_count += 1
                         logger.info(f"Added job #{job_count}: {job['title']} at {job['company']}")
-                    
-                    # Short delay between locations
-                    time.sleep(2)
+                    else:
+                        # Let a later search retry jobs whose page failed to load
+                        self._seen_ids.discard(job_id)
                 
                 logger.info(f"Found {job_count} jobs on LinkedIn")
                 
@@ -230,26 +201,124 @@ class JobDiscovery:
                 logger.debug(f"Stack trace: {traceback.format_exc()}")
             
             finally:
-                browser.close()
+                await context.close()
+    
+    def _search_linkedin_guest(self, keywords, location, limit):
+        """List job URLs for a location from LinkedIn's guest search API, or None if it is unavailable."""
+        job_urls = []
+        start = 0
+        headers = {'User-Agent': self.config['browser']['user_agent']}
+        
+        try:
+            while len(job_urls) < limit:
+                response = self.session.get(
+                    GUEST_SEARCH_URL,
+                    params={'keywords': keywords, 'location': location, 'f_TPR': 'r86400', 'start': start},
+                    headers=headers,
+                    timeout=10
+                )
+                if response.status_code != 200:
+                    logger.warning(f"LinkedIn guest search unavailable: {response.status_code}")
+                    return job_urls or None
+                
+                cards = BeautifulSoup(response.text, "html.parser").select('a[href*="/jobs/view/"]')
+                if not cards:
+                    break
+                job_urls.extend(card['href'] for card in cards)
+                
+                # Pages are not always full, so advance by what was actually returned
+                start += len(cards)
+        except Exception as e:
+            logger.warning(f"LinkedIn guest search failed: {str(e)}")
+            return job_urls or None
+        
+        return job_urls[:limit]
+    
+    async def _search_linkedin_page(self, page, keywords, location, limit):
+        """List job URLs from the LinkedIn search page for a location."""
+        # Format search URL
+        search_url = f"https://www.linkedin.com/jobs/search/?keywords={keywords.replace(' ', '%20')}&location={location.replace(' ', '%20')}&f_TPR=r86400"
+        
+        # Navigate to search URL and wait only for the job links, not the whole page
+        await page.goto(search_url, wait_until="commit", timeout=15000)
+        try:
+            await page.wait_for_selector('a[href*="/jobs/view/"]', timeout=8000)
+        except Exception:
+            logger.info(f"No job results in {location}")
+            return []
+        
+        # Save screenshot for debugging
+        if self.debug:
+            await page.screenshot(path=f"logs/linkedin_search_{location}.jpg", type="jpeg", quality=60)
+        
+        # Scroll to load more jobs until enough are listed or no new ones appear
+        logger.info("Loading more jobs...")
+        link_count = await page.evaluate(JS_COUNT_JOB_LINKS)
+        for _ in range(3):
+            if link_count >= limit:
+                break
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            try:
+                handle = await page.wait_for_function(JS_MORE_JOB_LINKS, arg=link_count, timeout=3000)
+            except Exception:
+                break
+            link_count = await handle.json_value()
+        
+        # Extract job URLs only
+        return await page.evaluate("""(limit) => {
+            const links = Array.from(document.querySelectorAll('a[href*="/jobs/view/"]'));
+            return links.slice(0, limit).map(link => link.href);
+        }""", limit)
+    
+    async def _fetch_linkedin_job(self, pages, job_id, clean_url, location):
+        """Visit a job page on the next free page in pages and return the job, or None on failure."""
+        page = await pages.get()
+        try:
+            logger.info(f"Visiting job URL: {clean_url}")
+            
+            # Navigate to job page and wait only for the element the extractor reads
+            await page.goto(clean_url, wait_until="commit", timeout=15000)
+            await page.wait_for_selector(TITLE_SELECTOR, timeout=8000)
+            
+            # Extract job details directly from the job page
+            title, company, job_location, description = await asyncio.gather(
+                _read_text(page, TITLE_SELECTOR, 'Unknown Title'),
+                _read_text(page, COMPANY_SELECTOR, 'Unknown Company'),
+                _read_text(page, LOCATION_SELECTOR, location),
+                page.evaluate(JS_DESC)
+            )
+            
+            # Trim spaces around lines and collapse runs of blank lines
+            description = _clean_description(description)
+            
+            # Create job object
+            return {
+                'title': title,
+                'company': company,
+                'location': job_location,
+                'url': clean_url,
+                'source': 'linkedin',
+                'id': job_id,
+                'description': description
+            }
+            
+        except Exception as e:
+            logger.error(f"Error visiting job {clean_url}: {str(e)}")
+            return None
+        
+        finally:
+            pages.put_nowait(page)
     
     def filter_jobs(self):
         """Filter job listings based on criteria."""
         filtered_jobs = []
         
-        # Get filter criteria from config
-        exclude_keywords = self.config['job_search'].get('exclude_keywords', [])
-        
         for job in self.job_listings:
             # Check if job should be excluded based on keywords
-            should_exclude = False
-            
-            for keyword in exclude_keywords:
-                if keyword.lower() in job['title'].lower():
-                    logger.debug(f"Excluding job {job['title']} due to keyword: {keyword}")
-                    should_exclude = True
-                    break
-            
-            if not should_exclude:
+            match = self._exclude_re.search(job['title'])
+            if match:
+                logger.debug(f"Excluding job {job['title']} due to keyword: {match.group(0)}")
+            else:
                 filtered_jobs.append(job)
         
         return filtered_jobs
@@ -257,23 +326,11 @@ class JobDiscovery:
     def export_jobs_to_file(self, file_path="found_jobs.json"):
         """Export the found jobs to a JSON file with proper formatting."""
         try:
-            # Create a copy of job listings with cleaned descriptions
-            export_listings = []
-            for job in self.job_listings:
-                job_copy = job.copy()
-                
-                # Ensure description is properly formatted
-                if 'description' in job_copy and job_copy['description']:
-                    # Remove excessive newlines and whitespace
-                    desc = job_copy['description']
-                    desc = '\n'.join(line.strip() for line in desc.split('\n'))
-                    desc = desc.replace('\n\n\n', '\n\n')
-                    job_copy['description'] = desc
-                
-                export_listings.append(job_copy)
+            # Build the exported listings with cleaned descriptions, leaving the jobs themselves untouched
+            export_listings = [{**job, 'description': _clean_description(job.get('description') or '')} for job in self.job_listings]
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(export_listings, f, indent=2, ensure_ascii=False)
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps(export_listings, option=orjson.OPT_INDENT_2))
             
             logger.info(f"Exported {len(self.job_listings)} jobs to {file_path}")
             return True
@@ -1,55 +1,169 @@
 import os
 import requests
 import json
+import orjson
 from loguru import logger
+from src.utils import fetch_ollama_model_names, get_context_window, OLLAMA_KEEP_ALIVE
+from src.rate_limiter import RateLimiter
+
+JSON_HEADERS = {"Content-Type": "application/json"}
 
 class LLMProvider:
     """Provider for Ollama LLM services"""
     
-    def __init__(self, config):
+    def __init__(self, config, session=None):
         self.config = config
+        self.session = session or requests.Session()
+        self._encoded_fields = None  # (options key, encoded request fields) from the last call
+        self.rate_limiter = RateLimiter.from_config(config)  # Shared by every generation call on this provider
+        self.timeout = (5, config.get('llm', {}).get('request_timeout', 120))  # (connect, read between chunks) in seconds
         
         # Set up Ollama
         self.ollama_host = os.environ.get('OLLAMA_HOST', 'http://localhost:11434')
         self.ollama_model = config.get('llm', {}).get('ollama_model', 'llama2')
+        self.num_ctx = get_context_window(config, self.session)  # Fixed so Ollama never reloads the model between calls
+        self.keep_alive = config.get('llm', {}).get('keep_alive', OLLAMA_KEEP_ALIVE)  # Same policy as preload_ollama_model
         logger.info(f"Using Ollama with model {self.ollama_model} at {self.ollama_host}")
     
-    def generate_text(self, system_prompt, user_prompt, max_tokens=1500, temperature=0.7):
+    def generate_text(self, system_prompt, user_prompt, max_tokens=1500, temperature=0.7, stop_pattern=None):
         """Generate text using Ollama"""
-        return self._generate_with_ollama(system_prompt, user_prompt, max_tokens, temperature)
+        self.rate_limiter.acquire(self._estimate_tokens(system_prompt, user_prompt, max_tokens))
+        return self._generate_with_ollama(system_prompt, user_prompt, max_tokens, temperature, stop_pattern)
     
-    def _generate_with_ollama(self, system_prompt, user_prompt, max_tokens=1500, temperature=0.7):
-        """Generate text using Ollama API"""
+    def generate_text_stream(self, system_prompt, user_prompt, max_tokens=1500, temperature=0.7, stop_pattern=None):
+        """Generate text using Ollama, yielding chunks as they arrive; raises if the stream fails or ends early"""
+        self.rate_limiter.acquire(self._estimate_tokens(system_prompt, user_prompt, max_tokens))
+        yield from self._stream_with_ollama(system_prompt, user_prompt, max_tokens, temperature, stop_pattern)
+    
+    async def generate_text_async(self, client, system_prompt, user_prompt, max_tokens=1500, temperature=0.7, stop_pattern=None):
+        """Generate text using Ollama over a shared httpx.AsyncClient"""
+        await self.rate_limiter.acquire_async(self._estimate_tokens(system_prompt, user_prompt, max_tokens))
+        
         try:
-            # Combine system and user prompts for Ollama
-            combined_prompt = f"{system_prompt}\n\n{user_prompt}"
+            url = f"{self.ollama_host}/api/chat"
+            body = self._encode_payload(system_prompt, user_prompt, max_tokens, temperature)
             
-            # Prepare the request
-            url = f"{self.ollama_host}/api/generate"
-            payload = {
-                "model": self.ollama_model,
-                "prompt": combined_prompt,
-                "stream": False,
-                "options": {
-                    "temperature": temperature,
-                    "num_predict": max_tokens
-                }
-            }
+            async with client.stream("POST", url, content=body, headers=JSON_HEADERS) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    logger.error(f"Ollama API error: {response.status_code} - {response.text}")
+                    return None
+                
+                parts = []
+                async for line in response.aiter_lines():
+                    if self._consume_line(line, parts, stop_pattern):
+                        break
+                else:
+                    # Never return a truncated response as if generation had finished
+                    logger.error("Ollama stream ended before generation finished")
+                    return None
+                return "".join(parts).strip()
+                
+        except Exception as e:
+            logger.error(f"Error generating text with Ollama: {str(e)}")
+            return None
+    
+    def _estimate_tokens(self, system_prompt, user_prompt, max_tokens):
+        """Roughly estimate the tokens a request will use (about 4 characters per prompt token)"""
+        return (len(system_prompt) + len(user_prompt)) // 4 + max_tokens
+    
+    def warm_up(self, system_prompt, prefix_prompt):
+        """Load the model and evaluate a shared prompt prefix so later prompts starting with it reuse the KV cache"""
+        try:
+            url = f"{self.ollama_host}/api/chat"
+            payload = self._build_payload(system_prompt, prefix_prompt, max_tokens=1, temperature=0)
+            payload["stream"] = False
             
-            # Make the request
-            response = requests.post(url, json=payload)
+            response = self.session.post(url, json=payload, timeout=self.timeout)
             
             if response.status_code == 200:
-                result = response.json()
-                return result.get('response', '').strip()
+                return True
             else:
-                logger.error(f"Ollama API error: {response.status_code} - {response.text}")
-                return None
+                logger.warning(f"Ollama warm-up failed: {response.status_code} - {response.text}")
+                return False
                 
+        except Exception as e:
+            logger.warning(f"Ollama warm-up failed: {str(e)}")
+            return False
+    
+    def _build_payload(self, system_prompt, user_prompt, max_tokens, temperature):
+        """Build the /api/chat request body"""
+        # Keeping the system prompt in its own message lets Ollama reuse its cached evaluation
+        return {
+            "model": self.ollama_model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "stream": True,
+            "keep_alive": self.keep_alive,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens,
+                "num_ctx": self.num_ctx
+            }
+        }
+    
+    def _encode_payload(self, system_prompt, user_prompt, max_tokens, temperature):
+        """Serialize the request body, reusing the encoded fields shared by consecutive calls"""
+        payload = self._build_payload(system_prompt, user_prompt, max_tokens, temperature)
+        messages = payload.pop("messages")
+        
+        # Model and the other options are identical across a batch, while max_tokens varies per job,
+        # so the encoded prefix ends inside "options" and num_predict and the messages are appended per call
+        cached = self._encoded_fields
+        if cached is None or cached[0] != temperature:
+            del payload["options"]["num_predict"]
+            cached = (temperature, orjson.dumps(payload)[:-2])
+            self._encoded_fields = cached
+        
+        return cached[1] + b',"num_predict":' + orjson.dumps(max_tokens) + b'},"messages":' + orjson.dumps(messages) + b'}'
+    
+    def _consume_line(self, line, parts, stop_pattern):
+        """Append one streamed chunk to parts and return True once generation should stop"""
+        if not line:
+            return False
+        
+        chunk = json.loads(line)
+        parts.append(chunk.get('message', {}).get('content', ''))
+        if chunk.get('done'):
+            return True
+        
+        # Only the most recent tokens can complete the stop pattern
+        return bool(stop_pattern and stop_pattern.search("".join(parts[-16:])))
+    
+    def _generate_with_ollama(self, system_prompt, user_prompt, max_tokens=1500, temperature=0.7, stop_pattern=None):
+        """Generate text using Ollama API"""
+        try:
+            text = "".join(self._stream_with_ollama(system_prompt, user_prompt, max_tokens, temperature, stop_pattern)).strip()
+            return text or None
         except Exception as e:
             logger.error(f"Error generating text with Ollama: {str(e)}")
             return None
     
+    def _stream_with_ollama(self, system_prompt, user_prompt, max_tokens=1500, temperature=0.7, stop_pattern=None):
+        """Yield generated text chunks from the Ollama API, raising if the stream fails or ends before it is done"""
+        # Prepare the request
+        url = f"{self.ollama_host}/api/chat"
+        body = self._encode_payload(system_prompt, user_prompt, max_tokens, temperature)
+        
+        # Stream the response so generation can stop as soon as the stop pattern appears
+        with self.session.post(url, data=body, headers=JSON_HEADERS, stream=True, timeout=self.timeout) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"Ollama API error: {response.status_code} - {response.text}")
+            
+            parts = []
+            for line in response.iter_lines():
+                count = len(parts)
+                done = self._consume_line(line, parts, stop_pattern)
+                if len(parts) > count:
+                    yield parts[-1]
+                if done:
+                    break
+            else:
+                # The connection closed without a final chunk, so the text is incomplete
+                raise IOError("Ollama stream ended before generation finished")
+    
     def is_available(self):
         """Check if Ollama is available"""
         return self._check_ollama_available()
@@ -57,18 +171,16 @@ class LLMProvider:
     def _check_ollama_available(self):
         """Check if Ollama API is available"""
         try:
-            url = f"{self.ollama_host}/api/tags"
-            response = requests.get(url)
+            status_code, model_names = fetch_ollama_model_names(self.ollama_host, self.session)
             
-            if response.status_code == 200:
-                models = response.json().get('models', [])
-                if any(model.get('name') == self.ollama_model for model in models):
+            if status_code == 200:
+                if self.ollama_model in model_names:
                     return True
                 else:
                     logger.warning(f"Model {self.ollama_model} not found in Ollama")
                     return False
             else:
-                logger.error(f"Ollama API check failed: {response.status_code}")
+                logger.error(f"Ollama API check failed: {status_code}")
                 return False
         except Exception as e:
             logger.error(f"Ollama API check failed: {str(e)}")
@@ -0,0 +1,64 @@
+import time
+import asyncio
+import threading
+from loguru import logger
+
+class RateLimiter:
+    """Token-bucket limiter for LLM requests per minute and tokens per minute."""
+
+    def __init__(self, rpm=500, tpm=None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._lock = threading.Lock()
+        self._request_budget = float(rpm)
+        self._token_budget = float(tpm) if tpm else None
+        self._updated = time.monotonic()
+
+    @classmethod
+    def from_config(cls, config):
+        """Create a limiter from the rpm and tpm settings in the llm config section."""
+        llm_config = config.get('llm', {})
+        return cls(rpm=llm_config.get('rpm', 500), tpm=llm_config.get('tpm'))
+
+    def _refill(self, now):
+        """Top up both buckets for the time elapsed since the last call."""
+        elapsed = now - self._updated
+        self._updated = now
+        self._request_budget = min(self.rpm, self._request_budget + elapsed * self.rpm / 60)
+        if self._token_budget is not None:
+            self._token_budget = min(self.tpm, self._token_budget + elapsed * self.tpm / 60)
+
+    def _reserve(self, tokens):
+        """Take capacity for one request if available, otherwise return the seconds to wait."""
+        with self._lock:
+            self._refill(time.monotonic())
+
+            wait = max(0.0, (1 - self._request_budget) * 60 / self.rpm)
+            if self._token_budget is not None:
+                # A single request larger than the whole budget waits for a full bucket
+                tokens = min(tokens, self.tpm)
+                wait = max(wait, (tokens - self._token_budget) * 60 / self.tpm)
+
+            if wait <= 0:
+                self._request_budget -= 1
+                if self._token_budget is not None:
+                    self._token_budget -= tokens
+            return wait
+
+    def acquire(self, tokens=0):
+        """Block until a request using the given number of tokens may be sent."""
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            logger.debug(f"Rate limit reached, waiting {wait:.2f}s")
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=0):
+        """Wait without blocking the event loop until a request may be sent."""
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            logger.debug(f"Rate limit reached, waiting {wait:.2f}s")
+            await asyncio.sleep(wait)
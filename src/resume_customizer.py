@@ -1,14 +1,42 @@
 import os
-import json
+import orjson
+import asyncio
 from docx import Document
 import openai
 from loguru import logger
+from string import Template
 from src.utils import get_resume_path
 
+# Cover letter filled in with the user and job details
+COVER_LETTER_TEMPLATE = Template("""
+        $name
+        $email
+        $phone
+        
+        Dear Hiring Manager,
+        
+        I am writing to express my strong interest in the $title position at $company. My name is $name, and I am a recent graduate from Concordia University with a solid foundation in programming, gained through both academic coursework and practical work experiences. Over the course of my studies, I have cultivated strong skills in various programming languages (C++ OOP, Java, Python, and assembly languages) and developed proficiency in multiple operating systems (Linux, Windows, and macOS).
+        
+        During an 8-month internship at Boeing as an Application Software Developer, I strengthened my Python expertise by working on back-end services to improve automation and operational efficiency. My responsibilities included developing features using Python and XML in a Linux environment, and I also gained hands-on experience with Bash scripting, Oracle databases, and Agile methodologies. This role allowed me to create and implement features that streamlined debugging in production, significantly improving system reliability and reducing troubleshooting time.
+        
+        After successfully completing my internship, I transitioned into a full-time role at Boeing, where I am leading the implementation of a groundbreaking pilot bidding application—the first of its kind in North America for Boeing. This system integrates seamlessly with other planning products, enhancing operational efficiency and pilot experience. Through this project, I have expanded my expertise in project management and innovative software solutions, reinforcing my passion for solving complex challenges.
+        
+        Beyond my professional roles, I have undertaken several projects that showcase my skills. These include:
+        - Creating a process manager leveraging multithreading and virtual memory management.
+        - Building a fully functioning portable breathalyzer and companion Android application.
+        - Developing a real-time offline translation system, using RabbitMQ for efficient message routing and Docker for containerization with a Python FastAPI backend implementation.
+        
+        I am excited about the opportunity to contribute to $company and am eager to bring my skills and experiences to your team. Thank you for considering my application. I look forward to the possibility of discussing this exciting opportunity with you.
+        
+        Sincerely,
+        $name
+        """)
+
 class ResumeCustomizer:
     def __init__(self, config):
         self.config = config
         self.user_profile = self._load_user_profile()
+        self._user_subs = {key: self.config['user'][key] for key in ("name", "email", "phone")}
         
         # Set OpenAI API key from environment variable
         openai.api_key = os.environ.get("OPENAI_API_KEY")
@@ -18,8 +46,8 @@ class ResumeCustomizer:
     def _load_user_profile(self):
         """Load user profile from JSON file."""
         try:
-            with open("data/user_profile.json", "r") as f:
-                return json.load(f)
+            with open("data/user_profile.json", "rb") as f:
+                return orjson.loads(f.read())
         except FileNotFoundError:
             logger.warning("User profile not found. Creating a basic profile.")
             # Create a basic profile from config
@@ -37,8 +65,8 @@ class ResumeCustomizer:
             
             # Save the basic profile
             os.makedirs("data", exist_ok=True)
-            with open("data/user_profile.json", "w") as f:
-                json.dump(basic_profile, f, indent=2)
+            with open("data/user_profile.json", "wb") as f:
+                f.write(orjson.dumps(basic_profile, option=orjson.OPT_INDENT_2))
             
             return basic_profile
     
@@ -66,8 +94,8 @@ class ResumeCustomizer:
         # Generate a template cover letter
         template = self._generate_template_cover_letter(job)
         
-        # Save the cover letter
-        output_filename = f"data/cover_letters/cover_letter_{company}_{title}.txt"
+        # Save the cover letter; the job id keeps same-titled postings apart
+        output_filename = f"data/cover_letters/cover_letter_{company}_{title}_{job['id']}.txt"
         os.makedirs(os.path.dirname(output_filename), exist_ok=True)
         
         with open(output_filename, "w") as f:
@@ -76,30 +104,15 @@ class ResumeCustomizer:
         logger.success(f"Cover letter generated and saved to {output_filename}")
         return output_filename
     
+    def generate_cover_letters(self, jobs):
+        """Generate cover letters for several jobs, returning a dict of job id to path."""
+        return asyncio.run(self.generate_cover_letters_async(jobs))
+    
+    async def generate_cover_letters_async(self, jobs):
+        """Generate cover letters for several jobs concurrently, returning a dict of job id to path."""
+        paths = await asyncio.gather(*(asyncio.to_thread(self.generate_cover_letter, job) for job in jobs))
+        return {job['id']: path for job, path in zip(jobs, paths)}
+    
     def _generate_template_cover_letter(self, job):
         """Generate a template cover letter."""
-        template = f"""
-        {self.config['user']['name']}
-        {self.config['user']['email']}
-        {self.config['user']['phone']}
-        
-        Dear Hiring Manager,
-        
-        I am writing to express my strong interest in the {job['title']} position at {job['company']}. My name is {self.config['user']['name']}, and I am a recent graduate from Concordia University with a solid foundation in programming, gained through both academic coursework and practical work experiences. Over the course of my studies, I have cultivated strong skills in various programming languages (C++ OOP, Java, Python, and assembly languages) and developed proficiency in multiple operating systems (Linux, Windows, and macOS).
-        
-        During an 8-month internship at Boeing as an Application Software Developer, I strengthened my Python expertise by working on back-end services to improve automation and operational efficiency. My responsibilities included developing features using Python and XML in a Linux environment, and I also gained hands-on experience with Bash scripting, Oracle databases, and Agile methodologies. This role allowed me to create and implement features that streamlined debugging in production, significantly improving system reliability and reducing troubleshooting time.
-        
-        After successfully completing my internship, I transitioned into a full-time role at Boeing, where I am leading the implementation of a groundbreaking pilot bidding application—the first of its kind in North America for Boeing. This system integrates seamlessly with other planning products, enhancing operational efficiency and pilot experience. Through this project, I have expanded my expertise in project management and innovative software solutions, reinforcing my passion for solving complex challenges.
-        
-        Beyond my professional roles, I have undertaken several projects that showcase my skills. These include:
-        - Creating a process manager leveraging multithreading and virtual memory management.
-        - Building a fully functioning portable breathalyzer and companion Android application.
-        - Developing a real-time offline translation system, using RabbitMQ for efficient message routing and Docker for containerization with a Python FastAPI backend implementation.
-        
-        I am excited about the opportunity to contribute to {job['company']} and am eager to bring my skills and experiences to your team. Thank you for considering my application. I look forward to the possibility of discussing this exciting opportunity with you.
-        
-        Sincerely,
-        {self.config['user']['name']}
-        """
-        
-        return template 
\ No newline at end of file
+        return COVER_LETTER_TEMPLATE.substitute(self._user_subs, title=job['title'], company=job['company'])
@@ -1,46 +1,170 @@
 import os
+import re
 import sys
+import time
+import io
+import atexit
+import threading
 import shutil
-import yaml
-import logging
-import requests
+import hashlib
+import functools
+import orjson
 from loguru import logger
 from datetime import datetime
 
+# Seconds a fetched Ollama model list is reused before /api/tags is queried again
+OLLAMA_TAGS_TTL = 30
+
+# Seconds a successful availability check is trusted, and the (connect, read) timeout of the probe
+OLLAMA_CHECK_TTL = 60
+OLLAMA_PROBE_TIMEOUT = (1, 2)
+
+# Timeout in seconds of the /api/version liveness probe
+OLLAMA_VERSION_TIMEOUT = 0.5
+
+# Context size in tokens used when neither the config nor Ollama provides one
+DEFAULT_CONTEXT_WINDOW = 4096
+
+# How long Ollama keeps the model loaded after a request, unless llm.keep_alive overrides it
+OLLAMA_KEEP_ALIVE = "30m"
+
+# (host, model) -> monotonic time of the last successful availability check
+_ollama_checked = {}
+
+# (host, session) -> TTL bucket of the last /api/tags response fetched
+_ollama_tags_bucket = {}
+
+# Default directory for PDF text cached by content hash
+PDF_TEXT_CACHE_DIR = "data/cache/pdf_text"
+
+# Whitespace and page artifacts left behind by PDF text extraction
+_PDF_SPACES_RE = re.compile(r'[ \t]+')
+_PDF_BLANK_LINES_RE = re.compile(r'\n{3,}')
+_PDF_PAGE_NUMBER_RE = re.compile(r'^Page \d+( of \d+)?$', re.IGNORECASE)
+
+# Log files are written through a buffer flushed at this interval (seconds), rotated at
+# LOG_ROTATION_BYTES and removed after LOG_RETENTION_SECONDS
+LOG_FLUSH_INTERVAL = 0.5
+LOG_ROTATION_BYTES = 10 * 1024 * 1024
+LOG_RETENTION_SECONDS = 7 * 24 * 3600
+LOG_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+
+# Accepted prompt_yes_no answers and the prompt suffix shown for each default
+_YES_NO_ANSWERS = {"yes": True, "y": True, "ye": True, "no": False, "n": False}
+_YES_NO_PROMPTS = {None: " [y/n] ", "yes": " [Y/n] ", "no": " [y/N] "}
+
+class _BufferedLogSink:
+    """Loguru sink that writes through a filesystem-block-sized buffer flushed on a timer."""
+    
+    def __init__(self, path):
+        self.path = path
+        self.buffer_size = max(_block_size(os.path.dirname(path) or "."), 65536)
+        self._lock = threading.Lock()
+        self._file = self._open()
+        self._dirty = False  # Records written since the last flush
+        
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+        atexit.register(self.close)
+    
+    def _open(self):
+        return io.BufferedWriter(io.FileIO(self.path, 'a'), buffer_size=self.buffer_size)
+    
+    def write(self, message):
+        """Buffer one formatted record, rotating the file once it exceeds LOG_ROTATION_BYTES."""
+        with self._lock:
+            self._file.write(message.encode('utf-8'))
+            self._dirty = True
+            if self._file.tell() >= LOG_ROTATION_BYTES:
+                self._file.close()
+                root, ext = os.path.splitext(self.path)
+                os.replace(self.path, f"{root}.{datetime.now().strftime('%Y-%m-%d_%H-%M-%S_%f')}{ext}")
+                self._file = self._open()
+    
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+            self._dirty = False
+    
+    def close(self):
+        """Write out records still queued in loguru, then flush the buffer."""
+        logger.complete()
+        self.flush()
+    
+    def _flush_loop(self):
+        while True:
+            time.sleep(LOG_FLUSH_INTERVAL)
+            # Leave the lock to the writer while nothing new has been logged
+            if self._dirty:
+                self.flush()
+
+def _block_size(directory):
+    """Return the preferred I/O block size of the filesystem holding directory, or 0 if unknown."""
+    try:
+        return os.statvfs(directory).f_bsize
+    except (AttributeError, OSError):
+        return 0
+
+def _remove_old_logs(directory, max_age):
+    """Delete application log files older than max_age seconds."""
+    cutoff = time.time() - max_age
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith("job_application_") and entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+
 def setup_logging():
     """Configure logging for the application."""
     # Create logs directory if it doesn't exist
     os.makedirs("logs", exist_ok=True)
     
-    # Configure loguru
-    log_format = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
-    
     # Remove default handler
     logger.remove()
     
-    # Add console handler
-    logger.add(sys.stderr, format=log_format, level="INFO")
+    # Add console handler; only queue it when output is not interactive so terminal logs stay in step
+    logger.add(sys.stderr, format=LOG_FORMAT, level="INFO", enqueue=not sys.stderr.isatty())
     
-    # Add file handler with rotation
-    log_file = f"logs/job_application_{datetime.now().strftime('%Y%m%d')}.log"
-    logger.add(log_file, format=log_format, level="DEBUG", rotation="10 MB", retention="1 week")
+    # Add buffered file handler with rotation, written from loguru's background thread so callers never block on disk
+    _remove_old_logs("logs", LOG_RETENTION_SECONDS)
+    log_file = f"logs/job_application_{time.strftime('%Y%m%d')}.log"
+    logger.add(
+        _BufferedLogSink(log_file).write, format=LOG_FORMAT, level="DEBUG",
+        enqueue=True, backtrace=False, diagnose=False
+    )
     
     logger.info("Logging configured")
 
 def create_directory_structure():
     """Create the necessary directory structure for the application."""
-    directories = [
+    directories = {
         "config",
         "data",
         "logs",
         "src"
-    ]
+    }
+    
+    # One directory read finds what already exists; all entries are top-level so mkdir suffices
+    with os.scandir(".") as entries:
+        existing = {entry.name for entry in entries if entry.is_dir()}
     
-    for directory in directories:
-        os.makedirs(directory, exist_ok=True)
+    for directory in directories - existing:
+        os.mkdir(directory)
     
     logger.info("Directory structure created")
 
+def _data_files(directory="data"):
+    """Return the names of the entries in directory, re-listed only when it changes."""
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except OSError:
+        return frozenset()
+    return _list_directory(directory, mtime)
+
+@functools.lru_cache(maxsize=4)
+def _list_directory(directory, mtime):
+    """List directory once; mtime is only part of the cache key."""
+    with os.scandir(directory) as entries:
+        return frozenset(entry.name for entry in entries)
+
 def create_sample_resume():
     """
     Set up resume for the application.
@@ -51,21 +175,22 @@ def create_sample_resume():
     # Check for PDF resume
     pdf_resume_path = "data/resume.pdf"
     docx_resume_path = "data/resume_template.docx"
+    files = _data_files()
     
     # If PDF resume exists, make a backup
-    if os.path.exists(pdf_resume_path):
+    if "resume.pdf" in files:
         logger.info(f"Found existing PDF resume at {pdf_resume_path}")
         
         # Create a backup of the original PDF resume if it doesn't exist
         pdf_backup_path = "data/resume_original.pdf"
-        if not os.path.exists(pdf_backup_path):
-            shutil.copy2(pdf_resume_path, pdf_backup_path)
+        if "resume_original.pdf" not in files:
+            shutil.copyfile(pdf_resume_path, pdf_backup_path)
             logger.info(f"Created backup of original PDF resume at {pdf_backup_path}")
         
         return
     
     # If PDF doesn't exist, create a basic Word document as fallback
-    if not os.path.exists(docx_resume_path):
+    if "resume_template.docx" not in files:
         _create_basic_word_template(docx_resume_path)
         logger.warning("No PDF resume found. Please add your PDF resume to data/resume.pdf")
     else:
@@ -123,79 +248,380 @@ def get_resume_path():
     """
     pdf_path = "data/resume.pdf"
     docx_path = "data/resume_template.docx"
+    files = _data_files()
     
-    if os.path.exists(pdf_path):
+    if "resume.pdf" in files:
         return pdf_path
-    elif os.path.exists(docx_path):
+    elif "resume_template.docx" in files:
         return docx_path
     else:
         logger.error("No resume file found")
         return None 
 
+def extract_text_from_pdf(pdf_path, cache_directory=PDF_TEXT_CACHE_DIR):
+    """
+    Extract text from a PDF file.
+    
+    Results are cached in memory per (path, modification time) and on disk
+    per SHA-256 of the file contents, so unchanged files skip the PDF parse.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        cache_directory: Directory for the on-disk text cache, or None to disable it
+        
+    Returns:
+        str: Extracted text, or None if the file could not be read
+    """
+    try:
+        mtime = os.path.getmtime(pdf_path)
+    except OSError as e:
+        logger.error(f"Error extracting text from PDF: {str(e)}")
+        return None
+    
+    return _extract_text_from_pdf_cached(pdf_path, mtime, cache_directory)
+
+@functools.lru_cache(maxsize=8)
+def _extract_text_from_pdf_cached(pdf_path, mtime, cache_directory):
+    """Extract text from a PDF file via the on-disk cache; mtime is only part of the in-memory cache key."""
+    try:
+        with open(pdf_path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        logger.error(f"Error extracting text from PDF: {str(e)}")
+        return None
+    
+    cache_path = None
+    if cache_directory:
+        cache_path = os.path.join(cache_directory, f"{hashlib.sha256(data).hexdigest()}.txt")
+        if os.path.exists(cache_path):
+            with open(cache_path, "r") as f:
+                return f.read()
+    
+    text = _parse_pdf(data)
+    if text is not None and cache_path:
+        try:
+            os.makedirs(cache_directory, exist_ok=True)
+            with open(cache_path, "w") as f:
+                f.write(text)
+        except OSError as e:
+            logger.warning(f"Could not cache extracted PDF text: {str(e)}")
+    return text
+
+def _parse_pdf(data):
+    """Parse PDF bytes into text."""
+    try:
+        # Prefer PDFium's native text extraction, falling back to pure-Python PyPDF2
+        try:
+            import pypdfium2 as pdfium
+        except ImportError:
+            pdfium = None
+        
+        if pdfium is not None:
+            # One document for all pages; release each page's native buffers as soon as it is read
+            pdf = pdfium.PdfDocument(data)
+            try:
+                texts = []
+                for page in pdf:
+                    textpage = page.get_textpage()
+                    texts.append(textpage.get_text_range())
+                    textpage.close()
+                    page.close()
+                return "\n".join(texts).strip()
+            finally:
+                pdf.close()
+        
+        from PyPDF2 import PdfReader
+        
+        reader = PdfReader(io.BytesIO(data))
+        return "\n".join(page.extract_text() for page in reader.pages).strip()
+    except Exception as e:
+        logger.error(f"Error extracting text from PDF: {str(e)}")
+        return None
+
+def normalize_pdf_text(text):
+    """
+    Remove extraction noise from PDF text before it is sent to the LLM.
+    
+    Collapses runs of spaces and blank lines, drops "Page N of M" lines and
+    consecutive duplicate lines such as repeated headers.
+    
+    Returns:
+        str: Normalized text
+    """
+    if not text:
+        return text
+    
+    lines = []
+    for line in _PDF_SPACES_RE.sub(' ', text).split('\n'):
+        line = line.strip()
+        if _PDF_PAGE_NUMBER_RE.match(line):
+            continue
+        if line and lines and line == lines[-1]:
+            continue
+        lines.append(line)
+    
+    return _PDF_BLANK_LINES_RE.sub('\n\n', '\n'.join(lines)).strip()
+
 def get_cover_letter_path():
     """Get the path to the base cover letter."""
+    files = _data_files()
+    
     # Check for PDF cover letter
     pdf_path = "data/base_cover_letter.pdf"
-    if os.path.exists(pdf_path):
+    if "base_cover_letter.pdf" in files:
         return pdf_path
     
     # Check for text cover letter
     txt_path = "data/base_cover_letter.txt"
-    if os.path.exists(txt_path):
+    if "base_cover_letter.txt" in files:
         return txt_path
     
     return None 
 
-def check_ollama_available(config):
-    """Check if Ollama is available and working."""
+def create_http_session(pool_maxsize=32):
+    """Create a requests session that keeps pooled connections alive across Ollama calls."""
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_maxsize,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=2, backoff_factor=0.2)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['Connection'] = 'keep-alive'
+    return session
+
+@functools.lru_cache(maxsize=1)
+def _shared_session():
+    """Session used by the Ollama probes when the caller does not pass one."""
+    return create_http_session(pool_maxsize=4)
+
+def fetch_ollama_tags(ollama_host, session=None):
+    """
+    Fetch the list of models installed in Ollama.
+    
+    Responses are reused for OLLAMA_TAGS_TTL seconds so repeated availability
+    probes within a run do not hit /api/tags again. Connection errors are
+    raised to the caller and are not cached.
+    
+    Returns:
+        tuple: (status_code, models)
+    """
+    status_code, models, _ = _fetch_ollama_tags(ollama_host, session, _tags_ttl_bucket())
+    return status_code, models
+
+def fetch_ollama_model_names(ollama_host, session=None):
+    """
+    Fetch the names of the models installed in Ollama, cached like fetch_ollama_tags.
+    
+    Returns:
+        tuple: (status_code, frozenset of model names)
+    """
+    status_code, _, names = _fetch_ollama_tags(ollama_host, session, _tags_ttl_bucket())
+    return status_code, names
+
+def _tags_ttl_bucket():
+    """Return the current OLLAMA_TAGS_TTL window, used to expire cached /api/tags responses."""
+    return int(time.monotonic() // OLLAMA_TAGS_TTL)
+
+def _fetch_ollama_version_status(ollama_host, session=None):
+    """Query /api/version as a cheap liveness probe and return the status code."""
+    response = (session or _shared_session()).get(f"{ollama_host}/api/version", timeout=OLLAMA_VERSION_TIMEOUT)
+    return response.status_code
+
+def get_context_window(config, session=None):
+    """
+    Return the context size in tokens to request from Ollama.
+    
+    The model's own context length is read from /api/show; llm.context_window
+    caps it, and a null llm.context_window uses it in full.
+    """
+    configured = config.get('llm', {}).get('context_window', DEFAULT_CONTEXT_WINDOW)
+    ollama_host = os.environ.get('OLLAMA_HOST', 'http://localhost:11434')
+    ollama_model = config.get('llm', {}).get('ollama_model', 'llama2')
+    
+    try:
+        model_length = _fetch_ollama_context_length(ollama_host, ollama_model, session)
+    except Exception as e:
+        logger.debug("Could not read the context length of {}: {}", ollama_model, str(e))
+        model_length = None
+    
+    if model_length is None:
+        return configured or DEFAULT_CONTEXT_WINDOW
+    return min(configured, model_length) if configured else model_length
+
+@functools.lru_cache(maxsize=4)
+def _fetch_ollama_context_length(ollama_host, ollama_model, session):
+    """Read the model's trained context length from /api/show; errors are raised and not cached."""
+    response = (session or _shared_session()).post(f"{ollama_host}/api/show", json={"model": ollama_model}, timeout=OLLAMA_PROBE_TIMEOUT)
+    response.raise_for_status()
+    model_info = orjson.loads(response.content).get('model_info') or {}
+    for key, value in model_info.items():
+        if key.endswith('.context_length'):
+            return int(value)
+    return None
+
+@functools.lru_cache(maxsize=4)
+def _fetch_ollama_tags(ollama_host, session, ttl_bucket):
+    """Query /api/tags; ttl_bucket is only part of the cache key."""
+    response = (session or _shared_session()).get(f"{ollama_host}/api/tags", timeout=OLLAMA_PROBE_TIMEOUT)
+    _ollama_tags_bucket[(ollama_host, session)] = ttl_bucket
+    if response.status_code != 200:
+        return response.status_code, (), frozenset()
+    models = tuple(orjson.loads(response.content).get('models', ()))
+    return response.status_code, models, frozenset(model.get('name') for model in models)
+
+def write_file_if_changed(path, data):
+    """
+    Atomically write bytes to a file, skipping the write if the content is unchanged.
+    
+    Args:
+        path: Destination file path
+        data: Bytes to write
+        
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    new_hash = hashlib.blake2b(data).digest()
+    
+    # Compare against the hash of what is already on disk
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            if hashlib.blake2b(f.read()).digest() == new_hash:
+                return False
+    
+    # Write to a temporary file and rename so a crash never leaves a partial file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+def get_cover_letter_path_for(job_id, output_directory="data/cover_letters"):
+    """Get the canonical path of the customized cover letter for a job."""
+    return f"{output_directory}/{job_id}.txt"
+
+def check_ollama_available(config, session=None):
+    """Check if Ollama is available and working."""
     # Get Ollama host from environment or use default
     ollama_host = os.environ.get('OLLAMA_HOST', 'http://localhost:11434')
     ollama_model = config.get('llm', {}).get('ollama_model', 'llama2')
     
+    # Skip the probe if this host and model were confirmed recently
+    checked_at = _ollama_checked.get((ollama_host, ollama_model))
+    if checked_at is not None and time.monotonic() - checked_at < OLLAMA_CHECK_TTL:
+        return True
+    
     try:
-        # Check if Ollama server is running
-        url = f"{ollama_host}/api/tags"
-        response = requests.get(url)
+        # A cached model list says nothing about whether the server is still up, so check
+        # /api/version first; with no cached list, fetching /api/tags is the check itself
+        status_code = 200
+        if _ollama_tags_bucket.get((ollama_host, session)) == _tags_ttl_bucket():
+            status_code = _fetch_ollama_version_status(ollama_host, session)
         
-        if response.status_code == 200:
+        # The model list is only downloaded again once its cached copy expires
+        if status_code == 200:
+            status_code, model_names = fetch_ollama_model_names(ollama_host, session)
+        
+        if status_code == 200:
             # Check if the model exists
-            models = response.json().get('models', [])
-            if any(model.get('name') == ollama_model for model in models):
-                logger.info(f"Ollama is available with model {ollama_model}")
+            if ollama_model in model_names:
+                logger.info("Ollama is available with model {}", ollama_model)
+                _ollama_checked[(ollama_host, ollama_model)] = time.monotonic()
                 return True
             else:
-                logger.warning(f"Model {ollama_model} not found in Ollama. Please run: ollama pull {ollama_model}")
+                logger.warning("Model {model} not found in Ollama. Please run: ollama pull {model}", model=ollama_model)
                 return False
         else:
-            logger.error(f"Ollama server returned status code: {response.status_code}")
+            logger.error("Ollama server returned status code: {}", status_code)
             return False
     except Exception as e:
-        logger.error(f"Error connecting to Ollama: {str(e)}")
+        logger.error("Error connecting to Ollama: {}", str(e))
         logger.info("Make sure Ollama is installed and running")
         return False
 
+def warmup(config, session=None):
+    """
+    Run the independent startup checks concurrently.
+    
+    The Ollama probe waits on the network while the directory checks wait on the
+    filesystem, so startup takes as long as the slowest of them rather than their sum.
+    
+    Returns:
+        tuple: (ollama_available, resume_path)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        ollama_future = executor.submit(check_ollama_available, config, session)
+        directories_future = executor.submit(create_directory_structure)
+        resume_future = executor.submit(get_resume_path)
+        
+        directories_future.result()
+        return ollama_future.result(), resume_future.result()
+
+def preload_ollama_model(config, session=None):
+    """Ask Ollama to load the configured model and keep it in memory."""
+    ollama_host = os.environ.get('OLLAMA_HOST', 'http://localhost:11434')
+    ollama_model = config.get('llm', {}).get('ollama_model', 'llama2')
+    num_ctx = get_context_window(config, session)
+    keep_alive = config.get('llm', {}).get('keep_alive', OLLAMA_KEEP_ALIVE)
+    timeout = (5, config.get('llm', {}).get('request_timeout', 120))
+    
+    try:
+        # An empty prompt loads the model without generating anything; num_ctx and keep_alive
+        # must match the generation requests or Ollama reloads or unloads the model for them
+        response = (session or _shared_session()).post(
+            f"{ollama_host}/api/generate",
+            json={"model": ollama_model, "prompt": "", "keep_alive": keep_alive, "options": {"num_predict": 1, "num_ctx": num_ctx}},
+            timeout=timeout
+        )
+        if response.status_code == 200:
+            logger.debug("Preloaded Ollama model {}", ollama_model)
+        else:
+            logger.warning("Failed to preload Ollama model: {}", response.status_code)
+    except Exception as e:
+        logger.warning("Failed to preload Ollama model: {}", str(e))
+
+@functools.lru_cache(maxsize=1)
+def load_env_once():
+    """
+    Load the .env file into os.environ, parsing it at most once per process.
+    
+    As with load_dotenv(), variables already set in the environment take precedence.
+    
+    Returns:
+        dict: Variables read from the .env file
+    """
+    from dotenv import dotenv_values, find_dotenv
+    
+    values = dotenv_values(find_dotenv(usecwd=True))
+    for key, value in values.items():
+        if value is not None:
+            os.environ.setdefault(key, value)
+    return values
+
 def debug_env_vars():
     """Debug environment variables related to OpenAI."""
-    import os
-    
     # Check Ollama host
     ollama_host = os.environ.get('OLLAMA_HOST')
     if ollama_host:
-        logger.debug(f"OLLAMA_HOST found in environment: {ollama_host}")
+        logger.debug("OLLAMA_HOST found in environment: {}", ollama_host)
     else:
         logger.warning("OLLAMA_HOST not found in environment variables, using default: http://localhost:11434")
     
     # Check if python-dotenv is installed and try to load .env file manually
     try:
-        from dotenv import load_dotenv
-        load_dotenv()
+        env_file = load_env_once()
         
-        # Check if Ollama host is available after loading .env
-        ollama_host_after = os.environ.get('OLLAMA_HOST')
+        # Check if Ollama host is available after loading .env; values already set take precedence
+        ollama_host_after = ollama_host or env_file.get('OLLAMA_HOST')
         if ollama_host_after and not ollama_host:
-            logger.info(f"OLLAMA_HOST loaded from .env file: {ollama_host_after}")
+            logger.info("OLLAMA_HOST loaded from .env file: {}", ollama_host_after)
         elif not ollama_host_after:
             logger.warning("OLLAMA_HOST not found even after loading .env file, using default")
     except ImportError:
@@ -211,22 +637,16 @@ def prompt_yes_no(question, default="yes"):
     Returns:
         bool: True for "yes" or False for "no"
     """
-    valid = {"yes": True, "y": True, "ye": True, "no": False, "n": False}
-    if default is None:
-        prompt = " [y/n] "
-    elif default == "yes":
-        prompt = " [Y/n] "
-    elif default == "no":
-        prompt = " [y/N] "
-    else:
+    prompt = _YES_NO_PROMPTS.get(default)
+    if prompt is None:
         raise ValueError(f"Invalid default answer: '{default}'")
     
     while True:
         sys.stdout.write(question + prompt)
-        choice = input().lower()
-        if choice == '':
-            return valid[default]
-        elif choice in valid:
-            return valid[choice]
+        choice = input().strip().lower()
+        if choice == '' and default is not None:
+            return _YES_NO_ANSWERS[default]
+        elif choice in _YES_NO_ANSWERS:
+            return _YES_NO_ANSWERS[choice]
         else:
             sys.stdout.write("Please respond with 'yes' or 'no' (or 'y' or 'n').\n") 
\ No newline at end of file
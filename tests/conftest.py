@@ -0,0 +1,19 @@
+import pytest
+import requests
+
+from src import llm_provider
+from src.llm_provider import LLMProvider
+from src.cover_letter_generator import CoverLetterGenerator
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    """A cover letter generator working in tmp_path that never contacts Ollama."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(llm_provider, "get_context_window", lambda config, session=None: config['llm']['context_window'])
+    monkeypatch.setattr(LLMProvider, "is_available", lambda self: True)
+
+    config = {'llm': {'context_window': 4096, 'batch_rows': 4}, 'user': {'name': 'Sami Farhat'}}
+    gen = CoverLetterGenerator(config, max_workers=1, session=requests.Session(), resume_text="Resume text", base_text="Base letter")
+    yield gen
+    gen.close()
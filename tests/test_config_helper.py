@@ -0,0 +1,92 @@
+import os
+
+from src import config_helper
+
+
+def _load(text):
+    os.makedirs("config", exist_ok=True)
+    with open("config/config.yaml", "w") as f:
+        f.write(text)
+    return config_helper.load_config_with_env_vars()
+
+
+def test_placeholder_replaced_from_environment(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("APPLYMATE_USER", "me@example.com")
+
+    assert _load('username: "${APPLYMATE_USER}"\n') == {'username': "me@example.com"}
+
+
+def test_quotes_and_backslashes_survive(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("APPLYMATE_PASSWORD", 'p"a\\ss')
+
+    assert _load('password: "${APPLYMATE_PASSWORD}"\n') == {'password': 'p"a\\ss'}
+
+
+def test_several_placeholders_in_one_value(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("APPLYMATE_HOST", "localhost")
+    monkeypatch.setenv("APPLYMATE_PORT", "11434")
+
+    assert _load('url: "http://${APPLYMATE_HOST}:${APPLYMATE_PORT}"\n') == {'url': "http://localhost:11434"}
+
+
+def test_missing_variable_is_left_in_place(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("APPLYMATE_MISSING", raising=False)
+
+    assert _load('key: "${APPLYMATE_MISSING}"\n') == {'key': "${APPLYMATE_MISSING}"}
+
+
+def test_changed_variable_invalidates_cached_config(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("APPLYMATE_USER", "first")
+    assert _load('username: "${APPLYMATE_USER}"\n') == {'username': "first"}
+    assert os.path.exists(config_helper.CONFIG_CACHE_PATH)
+
+    monkeypatch.setenv("APPLYMATE_USER", "second")
+    assert config_helper.load_config_with_env_vars() == {'username': "second"}
+
+
+def test_unreferenced_variable_keeps_cached_config(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("APPLYMATE_USER", "first")
+    _load('username: "${APPLYMATE_USER}"\n')
+
+    calls = []
+    monkeypatch.setattr(config_helper, "_save_cached_config", lambda *args: calls.append(args))
+    monkeypatch.setenv("APPLYMATE_UNRELATED", "changed")
+    assert config_helper.load_config_with_env_vars() == {'username': "first"}
+    assert calls == []
+
+
+def test_load_config_creates_config_from_example(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("config")
+    with open("config/config.yaml.example", "w") as f:
+        f.write("debug: false\n")
+
+    assert config_helper.load_config_with_env_vars() == {'debug': False}
+    assert os.path.exists("config/config.yaml")
+
+
+def test_unquoted_numeric_value_stays_a_string(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("APPLYMATE_PASSWORD", "12345")
+
+    assert _load('password: ${APPLYMATE_PASSWORD}\n') == {'password': "12345"}
+
+
+def test_value_with_comment_marker_is_kept_whole(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("APPLYMATE_PASSWORD", "abc #123")
+
+    assert _load('password: ${APPLYMATE_PASSWORD}\n') == {'password': "abc #123"}
+
+
+def test_single_quoted_placeholder_with_apostrophe(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("APPLYMATE_PASSWORD", "it's")
+
+    assert _load("password: '${APPLYMATE_PASSWORD}'\n") == {'password': "it's"}
@@ -0,0 +1,63 @@
+import os
+
+from src.cover_letter_cache import CoverLetterCache
+
+
+def test_key_depends_on_fingerprint_and_description():
+    key = CoverLetterCache.make_key("fingerprint", "description")
+
+    assert key == CoverLetterCache.make_key("fingerprint", "description")
+    assert key != CoverLetterCache.make_key("fingerprint", "other description")
+    assert key != CoverLetterCache.make_key("other fingerprint", "description")
+
+
+def test_missing_parts_hash_like_empty_text():
+    assert CoverLetterCache.make_key("fp", None) == CoverLetterCache.make_key("fp", "")
+
+
+def test_put_then_get_returns_cached_letter(tmp_path):
+    cache = CoverLetterCache(str(tmp_path / "cache"))
+    path = cache.put("key", "Dear Acme")
+
+    assert cache.get("key") == path
+    with open(path) as f:
+        assert f.read() == "Dear Acme"
+
+
+def test_get_misses_unknown_key(tmp_path):
+    assert CoverLetterCache(str(tmp_path / "cache")).get("unknown") is None
+
+
+def test_entry_without_file_is_a_miss(tmp_path):
+    cache = CoverLetterCache(str(tmp_path / "cache"))
+    os.remove(cache.put("key", "Dear Acme"))
+
+    assert cache.get("key") is None
+
+
+def test_entries_persist_across_instances(tmp_path):
+    CoverLetterCache(str(tmp_path / "cache")).put("key", "Dear Acme")
+
+    assert CoverLetterCache(str(tmp_path / "cache")).get("key") is not None
+
+
+def test_fingerprint_changes_with_every_input():
+    fingerprint = CoverLetterCache.make_fingerprint("resume", "base", "1")
+
+    assert fingerprint == CoverLetterCache.make_fingerprint("resume", "base", "1")
+    assert fingerprint != CoverLetterCache.make_fingerprint("edited resume", "base", "1")
+    assert fingerprint != CoverLetterCache.make_fingerprint("resume", "edited base", "1")
+    assert fingerprint != CoverLetterCache.make_fingerprint("resume", "base", "2")
+
+
+def test_parts_are_length_prefixed():
+    assert CoverLetterCache.make_fingerprint("ab", "c", "1") != CoverLetterCache.make_fingerprint("a", "bc", "1")
+
+
+def test_resume_edit_invalidates_cached_letters(tmp_path):
+    cache = CoverLetterCache(str(tmp_path / "cache"))
+    old = CoverLetterCache.make_fingerprint("resume", "base", "1")
+    cache.put(CoverLetterCache.make_key(old, "description"), "Dear Acme")
+
+    new = CoverLetterCache.make_fingerprint("edited resume", "base", "1")
+    assert cache.get(CoverLetterCache.make_key(new, "description")) is None
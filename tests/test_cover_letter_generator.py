@@ -0,0 +1,149 @@
+import json
+from types import SimpleNamespace
+
+from src import cover_letter_generator
+from src.cover_letter_generator import MAX_LETTER_TOKENS, MIN_DESCRIPTION_TOKENS
+
+
+def _job(job_id, description="Build Python services."):
+    return {'id': job_id, 'title': "Developer", 'company': f"Company {job_id}", 'description': description}
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def test_short_description_is_kept(generator):
+    assert generator._fit_description("Build Python services.", 1000) == ("Build Python services.", False)
+
+
+def test_long_description_keeps_head_and_tail(generator):
+    description = "start " + "filler " * 5000 + "end"
+    text, truncated = generator._fit_description(description, 500)
+
+    assert truncated
+    assert text.startswith("start") and text.endswith("end")
+    assert generator._count_tokens(text) < generator._count_tokens(description)
+
+
+def test_description_is_never_blanked(generator):
+    description = "filler " * 5000
+    text, truncated = generator._fit_description(description, -1000)
+
+    assert truncated
+    assert generator._count_tokens(text) >= MIN_DESCRIPTION_TOKENS - 10
+
+
+def test_budget_shrinks_with_every_letter(generator):
+    one = generator._description_budget(1)
+
+    assert generator._description_budget(2) == one - (MAX_LETTER_TOKENS + 200)
+    assert one < generator.context_window
+
+
+def test_budget_follows_prefix_changes(generator):
+    before = generator._description_budget(1)
+    generator._prefix_prompt = generator._prefix_prompt + "extra resume text " * 100
+
+    assert generator._description_budget(1) < before
+
+
+def test_batch_rows_reduced_to_fit_context(generator):
+    # 4096 tokens cannot hold even two letters of MAX_LETTER_TOKENS
+    assert generator._fitting_batch_rows(4) == 1
+
+    generator.context_window = 32768
+    assert generator._fitting_batch_rows(4) == 4
+    assert generator._fitting_batch_rows(1) == 1
+
+
+def test_max_tokens_capped_to_remaining_context(generator):
+    system_prompt, user_prompt = generator._build_prompts(_job("1"))
+    remaining = generator.context_window - generator._count_tokens(system_prompt + user_prompt)
+
+    assert generator._max_tokens(system_prompt, user_prompt, 4) == remaining
+    assert generator._max_tokens(system_prompt, user_prompt, 1) == min(MAX_LETTER_TOKENS, remaining)
+
+
+def test_truncated_and_empty_descriptions_are_not_cacheable(generator):
+    short, long_job = _job("1"), _job("2", "filler " * 20000)
+    generator._build_prompts(short)
+    generator._build_prompts(long_job)
+
+    assert generator.is_cacheable(short)
+    assert not generator.is_cacheable(long_job)
+    assert not generator.is_cacheable(_job("3", "   "))
+
+
+def test_marshaled_response_is_parsed_around_extra_text(generator, monkeypatch):
+    jobs = [_job("1"), _job("2")]
+    response = "Here are the letters:\n" + json.dumps({'letters': [
+        {'job_id': "1", 'letter': "Dear [Company], one"},
+        {'job_id': "2", 'letter': "Dear [Company], two"},
+        {'job_id': "99", 'letter': "Unknown job"}
+    ]}) + "\nGood luck!"
+    monkeypatch.setattr(generator.llm_provider, "generate_text", lambda **kwargs: response)
+
+    results = generator._generate_marshaled_chunk(jobs)
+    generator.flush()
+
+    assert set(results) == {"1", "2"}
+    assert _read(results["1"]) == "Dear Company 1, one"
+    assert _read(results["2"]) == "Dear Company 2, two"
+
+
+def test_unparseable_marshaled_response_returns_nothing(generator, monkeypatch):
+    monkeypatch.setattr(generator.llm_provider, "generate_text", lambda **kwargs: '{"letters": [{"job_id": "1", "letter": "Dear')
+
+    assert generator._generate_marshaled_chunk([_job("1"), _job("2")]) == {}
+
+
+def test_failed_marshaled_request_returns_nothing(generator, monkeypatch):
+    monkeypatch.setattr(generator.llm_provider, "generate_text", lambda **kwargs: None)
+
+    assert generator._generate_marshaled_chunk([_job("1"), _job("2")]) == {}
+
+
+def test_jobs_missing_from_batch_fall_back_to_single_requests(generator, monkeypatch):
+    generator.context_window = 32768
+    monkeypatch.setattr(cover_letter_generator, "httpx", None)
+    monkeypatch.setattr(generator.llm_provider, "generate_text",
+                        lambda **kwargs: json.dumps({'letters': [{'job_id': "1", 'letter': "Batched letter"}]}))
+    single = []
+    monkeypatch.setattr(generator, "_generate_single_cover_letter",
+                        lambda job: single.append(job['id']) or generator._save_cover_letter("Single letter", job))
+
+    results = generator._generate_uncached([_job("1"), _job("2")])
+    generator.flush()
+
+    assert single == ["2"]
+    assert _read(results["1"]) == "Batched letter"
+    assert _read(results["2"]) == "Single letter"
+
+
+def test_generated_letters_are_reused_from_cache(generator, monkeypatch):
+    monkeypatch.setattr(cover_letter_generator, "httpx", None)
+    monkeypatch.setattr(generator.llm_provider, "warm_up", lambda *args: True)
+    calls = []
+    monkeypatch.setattr(generator, "_generate_single_cover_letter",
+                        lambda job: calls.append(job['id']) or generator._save_cover_letter("Dear Company 1", job))
+
+    first = generator.generate_cover_letters_batch([_job("1")])
+    second = generator.generate_cover_letters_batch([_job("1")])
+
+    assert calls == ["1"]
+    assert _read(second["1"]) == _read(first["1"]) == "Dear Company 1"
+
+
+def test_unloadable_encoding_falls_back_to_estimate(generator, monkeypatch):
+    def unknown_model(model):
+        raise KeyError(model)
+
+    def offline(name):
+        raise OSError("offline")
+    monkeypatch.setattr(cover_letter_generator, "tiktoken", SimpleNamespace(encoding_for_model=unknown_model, get_encoding=offline))
+    generator._encoding = None
+
+    assert generator._count_tokens("x" * 400) == 100
+    assert generator._fit_description("filler " * 5000, 500)[1]
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+import requests
+
+from src import llm_provider
+from src.llm_provider import LLMProvider
+
+
+class FakeResponse:
+    def __init__(self, lines, status_code=200):
+        self.lines = lines
+        self.status_code = status_code
+        self.text = "error"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_lines(self):
+        yield from self.lines
+
+
+class FakeSession(requests.Session):
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+    def post(self, *args, **kwargs):
+        return self.response
+
+
+def _line(content, done=False):
+    return json.dumps({'message': {'content': content}, 'done': done})
+
+
+@pytest.fixture
+def make_provider(monkeypatch):
+    monkeypatch.setattr(llm_provider, "get_context_window", lambda config, session=None: 4096)
+
+    def make(response):
+        return LLMProvider({'llm': {}}, session=FakeSession(response))
+    return make
+
+
+def test_complete_stream_is_returned(make_provider):
+    provider = make_provider(FakeResponse([_line("Dear "), _line("Acme", done=True)]))
+
+    assert provider.generate_text("system", "user") == "Dear Acme"
+
+
+def test_stream_ending_early_is_a_failure(make_provider):
+    provider = make_provider(FakeResponse([_line("Dear "), _line("Ac")]))
+
+    assert provider.generate_text("system", "user") is None
+    with pytest.raises(IOError):
+        list(provider.generate_text_stream("system", "user"))
+
+
+def test_error_status_is_a_failure(make_provider):
+    provider = make_provider(FakeResponse([], status_code=500))
+
+    assert provider.generate_text("system", "user") is None
+    with pytest.raises(RuntimeError):
+        list(provider.generate_text_stream("system", "user"))
+
+
+def test_stop_pattern_ends_stream(make_provider):
+    import re
+    provider = make_provider(FakeResponse([_line("Sincerely, "), _line("Sami Farhat"), _line(" P.S.")]))
+
+    assert provider.generate_text("system", "user", stop_pattern=re.compile(r"Sincerely,\s*Sami Farhat")) == "Sincerely, Sami Farhat"
+
+
+def test_encoded_payload_follows_max_tokens(make_provider):
+    provider = make_provider(FakeResponse([]))
+
+    for max_tokens, temperature in [(1500, 0.7), (600, 0.7), (600, 0.2)]:
+        body = provider._encode_payload("system", "user", max_tokens, temperature)
+        assert json.loads(body) == provider._build_payload("system", "user", max_tokens, temperature)
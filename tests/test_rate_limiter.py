@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from src import rate_limiter
+from src.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_requests_within_budget_do_not_wait(clock):
+    limiter = RateLimiter(rpm=3)
+    for _ in range(3):
+        assert limiter._reserve(0) == 0
+
+
+def test_exhausted_request_budget_waits_for_refill(clock):
+    limiter = RateLimiter(rpm=60)
+    for _ in range(60):
+        limiter._reserve(0)
+
+    assert limiter._reserve(0) == pytest.approx(1.0)
+    clock.now += 1.0
+    assert limiter._reserve(0) == 0
+
+
+def test_token_budget_limits_large_requests(clock):
+    limiter = RateLimiter(rpm=100, tpm=600)
+    assert limiter._reserve(500) == 0
+
+    # 400 more tokens need 300 more than the 100 left, at 10 tokens per second
+    assert limiter._reserve(400) == pytest.approx(30.0)
+
+
+def test_request_larger_than_token_budget_waits_for_full_bucket(clock):
+    limiter = RateLimiter(rpm=100, tpm=600)
+    limiter._reserve(600)
+
+    assert limiter._reserve(10_000) == pytest.approx(60.0)
+
+
+def test_acquire_sleeps_until_capacity_is_available(clock):
+    limiter = RateLimiter(rpm=60)
+    start = clock.now
+    for _ in range(61):
+        limiter.acquire()
+
+    assert clock.now - start == pytest.approx(1.0)
+
+
+def test_acquire_async_waits_without_blocking(clock, monkeypatch):
+    waits = []
+
+    async def fake_sleep(seconds):
+        waits.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    limiter = RateLimiter(rpm=60)
+    for _ in range(60):
+        limiter._reserve(0)
+
+    asyncio.run(limiter.acquire_async())
+    assert waits == [pytest.approx(1.0)]
+
+
+def test_from_config_reads_llm_section():
+    limiter = RateLimiter.from_config({'llm': {'rpm': 30, 'tpm': 1000}})
+    assert (limiter.rpm, limiter.tpm) == (30, 1000)
+
+    assert RateLimiter.from_config({}).tpm is None
@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("docx")
+pytest.importorskip("openai")
+
+from src.resume_customizer import ResumeCustomizer
+
+
+CONFIG = {'user': {
+    'name': "Sami Farhat",
+    'email': "sami@example.com",
+    'phone': "123-456-7890",
+    'linkedin': "https://www.linkedin.com/in/sami/",
+    'github': "https://github.com/sami"
+}}
+
+
+@pytest.fixture
+def customizer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return ResumeCustomizer(CONFIG)
+
+
+def _job(job_id):
+    return {'id': job_id, 'title': f"Developer {job_id}", 'company': f"Company {job_id}"}
+
+
+def test_template_is_filled_with_user_and_job(customizer):
+    letter = customizer._generate_template_cover_letter(_job("1"))
+
+    assert "Developer 1 position at Company 1" in letter
+    assert "sami@example.com" in letter
+    assert "$" not in letter
+
+
+def test_batch_returns_a_letter_per_job(customizer):
+    jobs = [_job(str(i)) for i in range(5)]
+    paths = customizer.generate_cover_letters(jobs)
+
+    assert set(paths) == {job['id'] for job in jobs}
+    for job in jobs:
+        with open(paths[job['id']]) as f:
+            assert f"Company {job['id']}" in f.read()
+
+
+def test_same_company_and_title_do_not_share_a_file(customizer):
+    jobs = [{'id': job_id, 'title': "Developer", 'company': "Acme"} for job_id in ("1", "2")]
+    paths = customizer.generate_cover_letters(jobs)
+
+    assert paths["1"] != paths["2"]
+
+
+def test_empty_batch(customizer):
+    assert customizer.generate_cover_letters([]) == {}